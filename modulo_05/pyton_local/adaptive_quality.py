@@ -0,0 +1,87 @@
+import time
+import cv2
+
+
+class AdaptiveQuality:
+    """Baja la resolución interna de un filtro caro cuando no llega al presupuesto de tiempo
+
+    El filtro se aplica sobre una versión reducida del frame y el resultado se
+    reescala al tamaño original. La escala baja un escalón si el tiempo medio
+    supera el presupuesto durante patience frames seguidos, y sube cuando la
+    estimación a la escala superior cabe con margen (histéresis para no oscilar).
+    """
+
+    SCALES = (1.0, 0.75, 0.5, 0.35, 0.25)
+
+    def __init__(self, target_fps=20.0, scales=SCALES, patience=5, headroom=0.8):
+        self.scales = tuple(scales)
+        self.patience = patience
+        self.headroom = headroom
+        self.enabled = True
+        self.set_target_fps(target_fps)
+
+        self.level = 0
+        self.avg_ms = None
+        self.over_count = 0
+        self.under_count = 0
+        self.changes = 0
+
+    def set_target_fps(self, fps):
+        self.target_fps = max(1.0, float(fps))
+        self.budget_ms = 1000.0 / self.target_fps
+
+    @property
+    def scale(self):
+        return self.scales[self.level] if self.enabled else 1.0
+
+    def reset(self):
+        """Vuelve a resolución completa (p. ej. al desactivar el control)"""
+        self.level = 0
+        self.avg_ms = None
+        self.over_count = self.under_count = 0
+
+    def update(self, elapsed_ms):
+        """Registra el tiempo del último frame y ajusta la escala si hace falta"""
+        self.avg_ms = elapsed_ms if self.avg_ms is None else 0.7 * self.avg_ms + 0.3 * elapsed_ms
+
+        if self.avg_ms > self.budget_ms:
+            self.over_count += 1
+            self.under_count = 0
+            if self.over_count >= self.patience and self.level < len(self.scales) - 1:
+                self.set_level(self.level + 1)
+            return
+
+        self.over_count = 0
+        if self.level == 0:
+            return
+
+        # El coste es aproximadamente proporcional al número de píxeles
+        ratio = self.scales[self.level - 1] / self.scales[self.level]
+        if self.avg_ms * ratio * ratio < self.budget_ms * self.headroom:
+            self.under_count += 1
+            if self.under_count >= 2 * self.patience:
+                self.set_level(self.level - 1)
+        else:
+            self.under_count = 0
+
+    def set_level(self, level):
+        self.level = level
+        self.avg_ms = None  # Medir de nuevo a la escala nueva
+        self.over_count = self.under_count = 0
+        self.changes += 1
+
+    def process(self, frame, func):
+        """Aplica func a la escala actual, devuelve el resultado al tamaño del frame y mide el tiempo"""
+        start = time.perf_counter()
+        scale = self.scale
+        if scale >= 1.0:
+            result = func(frame)
+        else:
+            h, w = frame.shape[:2]
+            small_size = (max(16, int(w * scale)), max(16, int(h * scale)))
+            small = cv2.resize(frame, small_size, interpolation=cv2.INTER_AREA)
+            result = cv2.resize(func(small), (w, h), interpolation=cv2.INTER_LINEAR)
+
+        if self.enabled:
+            self.update((time.perf_counter() - start) * 1000)
+        return result
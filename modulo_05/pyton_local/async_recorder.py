@@ -0,0 +1,79 @@
+import queue
+import threading
+import cv2
+
+
+class AsyncVideoRecorder:
+    """Grabación de vídeo en un hilo aparte alimentado por una cola acotada
+
+    El bucle principal solo encola el frame; la codificación (XVID, etc.) la
+    hace el hilo del grabador. Si la cola se llena, policy decide:
+    - 'drop':  se descarta el frame y se cuenta
+    - 'block': se espera a que haya sitio (no se pierde ningún frame)
+    """
+
+    POLICIES = ('drop', 'block')
+
+    def __init__(self, path, frame_size, fps=20.0, fourcc='XVID', max_queue=32, policy='drop'):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Política desconocida: {policy} (opciones: {', '.join(self.POLICIES)})")
+
+        self.path = path
+        self.frame_size = frame_size
+        self.fps = fps
+        self.policy = policy
+        self.queue = queue.Queue(maxsize=max_queue)
+
+        self.writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), fps, frame_size)
+        if not self.writer.isOpened():
+            raise IOError(f"No se pudo crear el vídeo {path}")
+
+        # Contadores
+        self.queued = 0
+        self.written = 0
+        self.dropped = 0
+        self.max_depth = 0
+
+        self.thread = threading.Thread(target=self.writer_loop)
+        self.thread.daemon = True
+        self.thread.start()
+
+    @property
+    def depth(self):
+        """Frames esperando a ser codificados"""
+        return self.queue.qsize()
+
+    def write(self, frame, copy=True):
+        """Encola un frame; devuelve False si se ha descartado
+
+        Con copy=False el llamante no debe modificar el frame después.
+        """
+        item = frame.copy() if copy else frame
+        try:
+            if self.policy == 'block':
+                self.queue.put(item)
+            else:
+                self.queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+        self.queued += 1
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+        return True
+
+    def writer_loop(self):
+        """Hilo del grabador: codifica los frames en orden hasta recibir None"""
+        while True:
+            frame = self.queue.get()
+            if frame is None:
+                break
+            self.writer.write(frame)
+            self.written += 1
+
+    def stop(self):
+        """Vacía la cola (todo lo encolado se graba) y cierra el fichero"""
+        self.queue.put(None)
+        self.thread.join()
+        self.writer.release()
+        return self.written, self.dropped
@@ -0,0 +1,73 @@
+import time
+import cv2
+import numpy as np
+
+
+class AutoCannyThresholds:
+    """Umbrales de Canny a partir de la mediana de un histograma de intensidad que se va actualizando
+
+    El histograma se calcula sobre una rejilla submuestreada (un píxel de cada
+    step x step, con un desfase que rota cada frame para cubrir toda la imagen) y
+    se mezcla con el anterior con decaimiento exponencial. La mediana y los
+    percentiles salen del acumulado de 256 valores, sin ordenar píxeles.
+    Umbrales: (1 - sigma) * mediana y (1 + sigma) * mediana.
+    """
+
+    def __init__(self, step=4, decay=0.9, sigma=0.33, min_gap=10):
+        self.step = step
+        self.decay = decay
+        self.sigma = sigma
+        self.min_gap = min_gap
+
+        self.hist = None
+        self.cumulative = None
+        self.frames = 0
+
+        # Estadísticas de tiempo
+        self.last_ms = 0.0
+
+    def update(self, frame):
+        """Añade un frame (BGR o gris) al histograma y devuelve los umbrales (t1, t2)"""
+        start = time.perf_counter()
+
+        offset = self.frames % (self.step * self.step)
+        oy, ox = divmod(offset, self.step)
+        # Vecino más cercano: toma un píxel de cada bloque sin copiar el frame entero
+        h, w = frame.shape[:2]
+        size = (max(1, (w - ox) // self.step), max(1, (h - oy) // self.step))
+        sample = cv2.resize(frame[oy:, ox:], size, interpolation=cv2.INTER_NEAREST)
+        if sample.ndim == 3:
+            sample = cv2.cvtColor(sample, cv2.COLOR_BGR2GRAY)
+
+        hist = cv2.calcHist([sample], [0], None, [256], [0, 256]).ravel()
+        hist /= max(1.0, float(sample.size))
+        if self.hist is None:
+            self.hist = hist
+        else:
+            self.hist *= self.decay
+            self.hist += (1.0 - self.decay) * hist
+        self.cumulative = np.cumsum(self.hist)
+        self.frames += 1
+
+        thresholds = self.thresholds()
+        self.last_ms = (time.perf_counter() - start) * 1000
+        return thresholds
+
+    def percentile(self, q):
+        """Nivel de gris por debajo del cual queda el q% del histograma"""
+        if self.cumulative is None:
+            return 128
+        target = self.cumulative[-1] * q / 100.0
+        return int(np.searchsorted(self.cumulative, target))
+
+    @property
+    def median(self):
+        return self.percentile(50)
+
+    def thresholds(self):
+        median = self.median
+        low = int(max(0, (1.0 - self.sigma) * median))
+        high = int(min(255, (1.0 + self.sigma) * median))
+        # En escenas muy oscuras la mediana es baja: mantener una separación mínima
+        high = max(high, low + self.min_gap)
+        return low, high
@@ -0,0 +1,247 @@
+# Benchmark reproducible de filtros y colormaps
+# Frames sintéticos deterministas (misma semilla) a varias resoluciones; mide ms/frame,
+# fps y memoria reservada por frame, y compara con una línea base guardada en JSON.
+#
+# Ejemplos:
+#   py benchmark.py --guardar linea_base.json
+#   py benchmark.py --comparar linea_base.json --tolerancia 0.15
+#   py benchmark.py --suite canny3 colormaps --resoluciones vga 720p --repeticiones 20
+#   py benchmark.py --escalado 8 --resoluciones 1080p
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import cv2
+import numpy as np
+from frame_sources import SyntheticSource
+from filters import FilterChain, CANNY2_FILTERS
+from colormap_lut import ColormapRegistry
+from canny_sweep import CannySweep
+from striped_executor import StripedExecutor
+
+RESOLUTIONS = {
+    'vga': (640, 480),
+    '720p': (1280, 720),
+    '1080p': (1920, 1080),
+    '4k': (3840, 2160),
+}
+
+SUITES = ('canny3', 'canny2', 'colormaps', 'barrido')
+
+
+def synthetic_frames(width, height, count=3, seed=0):
+    """Frames deterministas: siempre los mismos píxeles para la misma semilla"""
+    source = SyntheticSource(width, height, 'shapes', seed=seed, realtime=False)
+    frames = [source.read()[1].copy() for _ in range(count)]
+    source.release()
+    return frames
+
+
+def canny3_cases():
+    """Los 12 filtros de WebcamFilterApp con sus parámetros por defecto"""
+    from wcam_Canny3 import WebcamFilterApp
+
+    app = WebcamFilterApp(headless=True)
+    for index, name in enumerate(app.filter_names):
+        chain = app.filter_chains[index]
+        values = app.chain_values()
+        yield name, chain.cost, lambda frame, chain=chain, values=values: chain.apply(frame, values)
+
+
+def canny2_cases():
+    """Los 12 filtros de wcam_Canny2.py"""
+    for name, steps in CANNY2_FILTERS:
+        chain = FilterChain(steps)
+        yield name, chain.cost, lambda frame, chain=chain: chain.apply(frame)
+
+
+def colormap_cases():
+    """Colormaps de RobustColormapGridViewer por su camino real: gris + LUT"""
+    from wcam_Filtros2 import OPENCV_COLORMAPS, MATPLOTLIB_COLORMAPS
+
+    registry = ColormapRegistry()
+    infos = [('opencv', cv_map, name) for cv_map, name in OPENCV_COLORMAPS]
+    infos += [('matplotlib', mpl_name, f"MPL_{mpl_name.upper()}") for mpl_name in MATPLOTLIB_COLORMAPS]
+    for info in infos:
+        if registry.register(info[0], info[1]):
+            yield info[2], info[0], lambda frame, info=info: registry.apply(
+                cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), info)
+
+
+def sweep_cases():
+    """Barrido de umbrales: un Canny completo por par frente a un solo Sobel compartido"""
+    sweep = CannySweep()
+
+    def full_canny(frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return [cv2.Canny(gray, t1, t2) for t1, t2 in sweep.pairs]
+
+    yield f"Canny x{len(sweep.pairs)}", 'cheap', full_canny
+    yield f"CannySweep x{len(sweep.pairs)}", 'cheap', lambda frame: sweep.evaluate(
+        cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+
+
+CASES = {
+    'canny3': canny3_cases,
+    'canny2': canny2_cases,
+    'colormaps': colormap_cases,
+    'barrido': sweep_cases,
+}
+
+
+def measure(func, frames, repeats=10, warmup=1):
+    """Mediana de ms/frame y MB reservados en la llamada con más memoria"""
+    for i in range(warmup):
+        func(frames[i % len(frames)])
+
+    times = []
+    for i in range(repeats):
+        frame = frames[i % len(frames)]
+        start = time.perf_counter()
+        func(frame)
+        times.append((time.perf_counter() - start) * 1000)
+
+    # Memoria: aparte, porque tracemalloc ralentiza la medida de tiempo
+    tracemalloc.start()
+    func(frames[0])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return float(np.median(times)), peak / (1024 * 1024)
+
+
+def run_benchmark(suites, resolutions, repeats=10, match=None):
+    """Ejecuta las suites y devuelve {clave: resultado}"""
+    results = {}
+    for res_name in resolutions:
+        width, height = RESOLUTIONS[res_name]
+        frames = synthetic_frames(width, height)
+        print(f"\n📐 {res_name} ({width}x{height})")
+
+        for suite in suites:
+            for name, kind, func in CASES[suite]():
+                if match and match.lower() not in name.lower():
+                    continue
+                ms, alloc_mb = measure(func, frames, repeats)
+                key = f"{suite}/{name}@{res_name}"
+                results[key] = {'ms': ms, 'fps': 1000.0 / ms if ms > 0 else 0.0,
+                                'alloc_mb': alloc_mb, 'kind': kind}
+                print(f"   {suite:<9} {name:<22} {ms:9.2f} ms {results[key]['fps']:8.1f} fps "
+                      f"{alloc_mb:7.1f} MB")
+    return results
+
+
+def run_scaling(resolutions, repeats=10, max_workers=None, match=None):
+    """Filtros caros por franjas con 1..N hilos: ms, aceleración y comprobación del resultado"""
+    max_workers = max_workers or os.cpu_count() or 1
+    results = {}
+    for res_name in resolutions:
+        width, height = RESOLUTIONS[res_name]
+        frames = synthetic_frames(width, height)
+        print(f"\n📐 {res_name} ({width}x{height}) - franjas en hilos, 1..{max_workers}")
+
+        for name, steps in CANNY2_FILTERS:
+            chain = FilterChain(steps)
+            if chain.cost != 'expensive' or (match and match.lower() not in name.lower()):
+                continue
+            reference = chain.apply(frames[0])
+            base_ms = None
+            for workers in range(1, max_workers + 1):
+                executor = StripedExecutor(workers)
+                func = lambda frame, executor=executor, chain=chain: executor.run(frame, chain.apply, chain.radius)
+                identical = np.array_equal(func(frames[0]), reference)
+                ms, _ = measure(func, frames, repeats)
+                executor.close()
+
+                base_ms = base_ms or ms
+                key = f"franjas/{name}@{res_name}/{workers}"
+                results[key] = {'ms': ms, 'fps': 1000.0 / ms if ms > 0 else 0.0,
+                                'speedup': base_ms / ms if ms > 0 else 0.0, 'identical': identical}
+                print(f"   {name:<16} {workers:2d} hilos {ms:9.2f} ms  x{results[key]['speedup']:4.2f} "
+                      f"{'✅' if identical else '❌ distinto'}")
+    return results
+
+
+def save_baseline(path, results, repeats):
+    data = {
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'opencv': cv2.__version__,
+        'numpy': np.__version__,
+        'machine': platform.platform(),
+        'repeats': repeats,
+        'results': results,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+
+
+def compare_baseline(path, results, tolerance=0.15):
+    """Lista de (clave, ms base, ms actual) que son más lentas que base * (1 + tolerancia)"""
+    with open(path, encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    if baseline.get('opencv') != cv2.__version__:
+        print(f"⚠️  Línea base con OpenCV {baseline.get('opencv')}, ahora {cv2.__version__}")
+
+    regressions = []
+    for key, result in results.items():
+        base = baseline['results'].get(key)
+        if base is None:
+            continue
+        change = result['ms'] / base['ms'] - 1 if base['ms'] > 0 else 0.0
+        if change > tolerance:
+            regressions.append((key, base['ms'], result['ms']))
+            print(f"🐢 {key}: {base['ms']:.2f} -> {result['ms']:.2f} ms (+{change * 100:.0f}%)")
+        elif change < -tolerance:
+            print(f"🚀 {key}: {base['ms']:.2f} -> {result['ms']:.2f} ms ({change * 100:.0f}%)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de filtros y colormaps con frames sintéticos")
+    parser.add_argument('--suite', nargs='+', choices=SUITES, default=list(SUITES))
+    parser.add_argument('--resoluciones', nargs='+', choices=list(RESOLUTIONS), default=list(RESOLUTIONS))
+    parser.add_argument('--repeticiones', type=int, default=10)
+    parser.add_argument('--filtro', default=None, help="Solo casos cuyo nombre contenga este texto")
+    parser.add_argument('--hilos', type=int, default=None, help="cv2.setNumThreads (por defecto, el de OpenCV)")
+    parser.add_argument('--guardar', default=None, help="Guardar los resultados como línea base (JSON)")
+    parser.add_argument('--comparar', default=None, help="Comparar con una línea base y fallar si hay regresiones")
+    parser.add_argument('--tolerancia', type=float, default=0.15, help="Margen antes de marcar regresión (0.15 = 15%%)")
+    parser.add_argument('--escalado', type=int, nargs='?', const=0, default=None, metavar='N',
+                        help="Escalado de los filtros caros por franjas con 1..N hilos (por defecto, los núcleos)")
+    args = parser.parse_args(argv)
+
+    if args.hilos is not None:
+        cv2.setNumThreads(args.hilos)
+
+    if args.escalado is not None:
+        print(f"🧵 Escalado por franjas - OpenCV {cv2.__version__} | {os.cpu_count()} núcleos | "
+              f"{cv2.getNumThreads()} hilos de OpenCV")
+        results = run_scaling(args.resoluciones, args.repeticiones, args.escalado or None, args.filtro)
+        return 0 if all(result['identical'] for result in results.values()) else 1
+
+    print(f"🏁 Benchmark - OpenCV {cv2.__version__} | {cv2.getNumThreads()} hilos | "
+          f"{args.repeticiones} repeticiones")
+    results = run_benchmark(args.suite, args.resoluciones, args.repeticiones, args.filtro)
+
+    if args.guardar:
+        save_baseline(args.guardar, results, args.repeticiones)
+        print(f"\n💾 Línea base guardada en {args.guardar}")
+
+    if args.comparar:
+        print(f"\n🔍 Comparando con {args.comparar} (tolerancia {args.tolerancia * 100:.0f}%)")
+        regressions = compare_baseline(args.comparar, results, args.tolerancia)
+        if regressions:
+            print(f"❌ {len(regressions)} regresiones")
+            return 1
+        print("✅ Sin regresiones")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+import json
+import math
+import cv2
+
+
+def find_blobs(mask, min_area=100, max_area=None, offset=(0, 0)):
+    """Componentes conexas de una máscara: [{'x', 'y', 'w', 'h', 'area', 'cx', 'cy'}, ...]
+
+    offset traslada las coordenadas cuando mask es un recorte (ROI) del frame.
+    """
+    count, _, stats, centroids = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    ox, oy = offset
+    blobs = []
+    for i in range(1, count):  # La 0 es el fondo
+        area = int(stats[i, cv2.CC_STAT_AREA])
+        if area < min_area or (max_area is not None and area > max_area):
+            continue
+        blobs.append({
+            'x': int(stats[i, cv2.CC_STAT_LEFT]) + ox,
+            'y': int(stats[i, cv2.CC_STAT_TOP]) + oy,
+            'w': int(stats[i, cv2.CC_STAT_WIDTH]),
+            'h': int(stats[i, cv2.CC_STAT_HEIGHT]),
+            'area': area,
+            'cx': float(centroids[i, 0]) + ox,
+            'cy': float(centroids[i, 1]) + oy,
+        })
+    return blobs
+
+
+class Track:
+    """Objeto seguido entre frames: última caja, velocidad en px/frame y contadores"""
+
+    def __init__(self, track_id, blob):
+        self.id = track_id
+        self.blob = blob
+        self.vx = 0.0
+        self.vy = 0.0
+        self.hits = 1
+        self.missed = 0
+
+    def predict(self):
+        """Centro esperado en el siguiente frame (velocidad constante)"""
+        steps = self.missed + 1
+        return self.blob['cx'] + self.vx * steps, self.blob['cy'] + self.vy * steps
+
+    def update(self, blob):
+        steps = self.missed + 1
+        vx = (blob['cx'] - self.blob['cx']) / steps
+        vy = (blob['cy'] - self.blob['cy']) / steps
+        # Suavizado para que el ruido de la máscara no haga saltar la velocidad
+        if self.hits == 1:
+            self.vx, self.vy = vx, vy
+        else:
+            self.vx = 0.5 * self.vx + 0.5 * vx
+            self.vy = 0.5 * self.vy + 0.5 * vy
+        self.blob = blob
+        self.hits += 1
+        self.missed = 0
+
+
+class BlobTracker:
+    """Seguimiento de manchas de una máscara con IDs estables entre frames
+
+    Asociación por el centro más cercano a la posición predicha (hasta max_distance).
+    Cuando todos los objetos están confirmados, solo se buscan componentes en la
+    ROI predicha de cada uno; cada full_scan_every frames, o si una mancha toca el
+    borde de su ROI, se vuelve a recorrer el frame completo para ver objetos nuevos.
+    """
+
+    def __init__(self, min_area=100, max_area=None, max_distance=60, max_missed=5,
+                 roi_margin=24, confirm_hits=3, full_scan_every=15):
+        self.min_area = min_area
+        self.max_area = max_area
+        self.max_distance = max_distance
+        self.max_missed = max_missed
+        self.roi_margin = roi_margin
+        self.confirm_hits = confirm_hits
+        self.full_scan_every = full_scan_every
+
+        self.tracks = []
+        self.next_id = 1
+        self.frame_index = -1
+        self.last_full_scan = None
+
+        # Estadísticas
+        self.full_scans = 0
+        self.roi_scans = 0
+
+    def predicted_roi(self, track, shape):
+        """Caja (x0, y0, x1, y1) alrededor de la posición predicha, recortada al frame"""
+        px, py = track.predict()
+        blob = track.blob
+        margin = self.roi_margin + abs(track.vx) + abs(track.vy)
+        x0 = int(max(0, px - blob['w'] / 2 - margin))
+        y0 = int(max(0, py - blob['h'] / 2 - margin))
+        x1 = int(min(shape[1], px + blob['w'] / 2 + margin + 1))
+        y1 = int(min(shape[0], py + blob['h'] / 2 + margin + 1))
+        return x0, y0, x1, y1
+
+    def confident(self):
+        return bool(self.tracks) and all(
+            track.hits >= self.confirm_hits and track.missed == 0 for track in self.tracks)
+
+    def scan_rois(self, mask):
+        """Manchas dentro de las ROI predichas; None si alguna queda cortada por su ROI"""
+        blobs = {}
+        for track in self.tracks:
+            x0, y0, x1, y1 = self.predicted_roi(track, mask.shape)
+            if x1 <= x0 or y1 <= y0:
+                return None
+            for blob in find_blobs(mask[y0:y1, x0:x1], self.min_area, self.max_area, (x0, y0)):
+                # Una mancha cortada por el borde de la ROI (y no por el del frame) no es fiable
+                if ((blob['x'] == x0 and x0 > 0) or (blob['y'] == y0 and y0 > 0) or
+                        (blob['x'] + blob['w'] == x1 and x1 < mask.shape[1]) or
+                        (blob['y'] + blob['h'] == y1 and y1 < mask.shape[0])):
+                    return None
+                # Las ROI pueden solaparse: la misma mancha solo cuenta una vez
+                blobs[(blob['x'], blob['y'], blob['w'], blob['h'])] = blob
+        return list(blobs.values())
+
+    def detect(self, mask):
+        blobs = None
+        due = self.last_full_scan is None or self.frame_index - self.last_full_scan >= self.full_scan_every
+        if self.confident() and not due:
+            blobs = self.scan_rois(mask)
+        if blobs is None:
+            blobs = find_blobs(mask, self.min_area, self.max_area)
+            self.last_full_scan = self.frame_index
+            self.full_scans += 1
+        else:
+            self.roi_scans += 1
+        return blobs
+
+    def associate(self, blobs):
+        """Emparejamiento voraz por distancia entre posición predicha y centro de cada mancha"""
+        pairs = []
+        for t, track in enumerate(self.tracks):
+            px, py = track.predict()
+            for b, blob in enumerate(blobs):
+                distance = math.hypot(blob['cx'] - px, blob['cy'] - py)
+                if distance <= self.max_distance:
+                    pairs.append((distance, t, b))
+        pairs.sort()
+
+        matches = {}
+        used_blobs = set()
+        for _, t, b in pairs:
+            if t not in matches and b not in used_blobs:
+                matches[t] = b
+                used_blobs.add(b)
+        return matches, used_blobs
+
+    def update(self, mask):
+        """Procesa la máscara de un frame y devuelve los registros de los objetos vistos"""
+        self.frame_index += 1
+        blobs = self.detect(mask)
+        matches, used_blobs = self.associate(blobs)
+
+        survivors = []
+        for t, track in enumerate(self.tracks):
+            if t in matches:
+                track.update(blobs[matches[t]])
+                survivors.append(track)
+            else:
+                track.missed += 1
+                if track.missed <= self.max_missed:
+                    survivors.append(track)
+
+        for b, blob in enumerate(blobs):
+            if b not in used_blobs:
+                survivors.append(Track(self.next_id, blob))
+                self.next_id += 1
+
+        self.tracks = survivors
+        return [self.record(track) for track in self.tracks if track.missed == 0]
+
+    def record(self, track):
+        """Registro plano de un objeto para volcarlo o enviarlo (una línea JSON)"""
+        blob = track.blob
+        return {
+            'frame': self.frame_index,
+            'id': track.id,
+            'x': blob['x'], 'y': blob['y'], 'w': blob['w'], 'h': blob['h'],
+            'area': blob['area'],
+            'cx': round(blob['cx'], 2), 'cy': round(blob['cy'], 2),
+            'vx': round(track.vx, 2), 'vy': round(track.vy, 2),
+        }
+
+    def draw(self, frame, records, color=(0, 255, 0)):
+        """Caja, ID y vector de velocidad de cada objeto"""
+        for rec in records:
+            x, y, w, h = rec['x'], rec['y'], rec['w'], rec['h']
+            cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
+            center = (int(rec['cx']), int(rec['cy']))
+            tip = (int(rec['cx'] + rec['vx'] * 5), int(rec['cy'] + rec['vy'] * 5))
+            cv2.arrowedLine(frame, center, tip, (0, 255, 255), 2, tipLength=0.3)
+            cv2.putText(frame, f"#{rec['id']}", (x, max(15, y - 5)), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+        return frame
+
+
+class RecordWriter:
+    """Flujo de registros en JSON Lines: un objeto por línea"""
+
+    def __init__(self, path):
+        self.file = open(path, 'w', encoding='utf-8')
+        self.count = 0
+
+    def write(self, records):
+        for rec in records:
+            self.file.write(json.dumps(rec) + "\n")
+        self.count += len(records)
+
+    def close(self):
+        self.file.close()
@@ -0,0 +1,131 @@
+import time
+import cv2
+import numpy as np
+from colormap_lut import grid_cell_views
+
+
+class CannySweep:
+    """Evalúa muchos pares de umbrales de Canny reutilizando el gradiente del frame
+
+    El Sobel dx/dy se calcula una vez por frame y cada par (t1, t2) solo hace la
+    supresión de no máximos y la histéresis con cv2.Canny(dx, dy, t1, t2). El
+    Sobel usa BORDER_REPLICATE, igual que Canny por dentro, así que los bordes
+    son idénticos a cv2.Canny(gray, t1, t2).
+
+    Para cada par se lleva la densidad de bordes y el parpadeo (píxeles de borde
+    que cambian respecto al frame anterior, relativo a los que hay) en una ventana
+    móvil; el par estable es el de menor parpadeo con una densidad razonable.
+    """
+
+    LOWS = (25, 50, 100, 150)
+    HIGHS = (100, 150, 200, 300)
+
+    def __init__(self, lows=LOWS, highs=HIGHS, aperture=3, l2_gradient=False,
+                 window=30, density_range=(0.01, 0.15)):
+        self.lows = tuple(lows)
+        self.highs = tuple(highs)
+        self.aperture = aperture
+        self.l2_gradient = l2_gradient
+        self.window = window
+        self.density_range = density_range
+
+        # Solo pares válidos (t1 < t2); posición en la retícula filas = t1, columnas = t2
+        self.pairs = [(t1, t2) for t1 in self.lows for t2 in self.highs if t1 < t2]
+
+        self.edges = None
+        self.previous = None
+        self.density = np.zeros((window, len(self.pairs)), dtype=np.float32)
+        self.flicker = np.zeros((window, len(self.pairs)), dtype=np.float32)
+        self.frames = 0
+
+        # Estadísticas de tiempo
+        self.gradient_ms = 0.0
+        self.sweep_ms = 0.0
+
+    def gradients(self, gray):
+        dx = cv2.Sobel(gray, cv2.CV_16S, 1, 0, ksize=self.aperture, borderType=cv2.BORDER_REPLICATE)
+        dy = cv2.Sobel(gray, cv2.CV_16S, 0, 1, ksize=self.aperture, borderType=cv2.BORDER_REPLICATE)
+        return dx, dy
+
+    def evaluate(self, gray):
+        """Bordes de todos los pares para un frame en gris: array (pares, h, w) uint8"""
+        start = time.perf_counter()
+        dx, dy = self.gradients(gray)
+        self.gradient_ms = (time.perf_counter() - start) * 1000
+
+        h, w = gray.shape
+        if self.edges is None or self.edges.shape[1:] != (h, w):
+            self.edges = np.empty((len(self.pairs), h, w), dtype=np.uint8)
+            self.previous = None
+
+        for i, (t1, t2) in enumerate(self.pairs):
+            cv2.Canny(dx, dy, t1, t2, edges=self.edges[i], L2gradient=self.l2_gradient)
+
+        self.update_stats()
+        self.sweep_ms = (time.perf_counter() - start) * 1000
+        return self.edges
+
+    def update_stats(self):
+        slot = self.frames % self.window
+        pixels = self.edges.shape[1] * self.edges.shape[2]
+        counts = np.array([cv2.countNonZero(e) for e in self.edges], dtype=np.float32)
+        self.density[slot] = counts / pixels
+
+        if self.previous is None:
+            self.previous = self.edges.copy()
+            self.flicker[slot] = 0
+        else:
+            changed = np.array([cv2.countNonZero(cv2.bitwise_xor(e, p)) for e, p in zip(self.edges, self.previous)],
+                               dtype=np.float32)
+            self.flicker[slot] = changed / np.maximum(counts, 1)
+            self.previous[...] = self.edges
+        self.frames += 1
+
+    def scores(self):
+        """(densidad media, parpadeo medio) de cada par en la ventana"""
+        count = min(self.frames, self.window)
+        if count == 0:
+            return np.zeros(len(self.pairs)), np.zeros(len(self.pairs))
+        return self.density[:count].mean(axis=0), self.flicker[:count].mean(axis=0)
+
+    def stable_pair(self):
+        """Par con menos parpadeo entre los de densidad dentro de density_range (o None)"""
+        if self.frames < 2:
+            return None
+        density, flicker = self.scores()
+        low, high = self.density_range
+        candidates = [i for i in range(len(self.pairs)) if low <= density[i] <= high]
+        if not candidates:
+            # Escena sin textura o muy ruidosa: el más cercano al rango
+            candidates = [int(np.argmin(np.abs(density - np.clip(density, low, high))))]
+        return self.pairs[min(candidates, key=lambda i: flicker[i])]
+
+    def contact_sheet(self, cell_size=(120, 160), padding=6, label_height=18):
+        """Retícula de miniaturas (filas = t1, columnas = t2) con el par estable recuadrado"""
+        rows, cols = len(self.lows), len(self.highs)
+        h, w = cell_size
+        step = (h + padding + label_height, w + padding)
+        canvas = np.zeros((rows * step[0] + padding + label_height, cols * step[1] + padding, 3), dtype=np.uint8)
+        if self.edges is None:
+            return canvas
+
+        # Vista (filas, columnas, h, w, 3) sobre las celdas del lienzo
+        cells = grid_cell_views(canvas, (padding + 2 * label_height, padding), step, (h, w), rows, cols)
+
+        density, flicker = self.scores()
+        stable = self.stable_pair()
+        for i, (t1, t2) in enumerate(self.pairs):
+            row, col = self.lows.index(t1), self.highs.index(t2)
+            cells[row, col] = cv2.resize(self.edges[i], (w, h), interpolation=cv2.INTER_AREA)[:, :, None]
+
+            x = padding + col * step[1]
+            y = padding + 2 * label_height + row * step[0]
+            color = (0, 255, 0) if (t1, t2) == stable else (200, 200, 200)
+            cv2.putText(canvas, f"{t1}/{t2}  {density[i] * 100:.1f}%  {flicker[i]:.2f}", (x, y - 4),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.38, color, 1)
+            if (t1, t2) == stable:
+                cv2.rectangle(canvas, (x - 2, y - 2), (x + w + 1, y + h + 1), color, 2)
+
+        cv2.putText(canvas, f"{len(self.pairs)} pares en {self.sweep_ms:.1f} ms (Sobel {self.gradient_ms:.1f} ms) | t1/t2  bordes  parpadeo",
+                    (padding, 16), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 255, 255), 1)
+        return canvas
@@ -0,0 +1,118 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+
+
+class CaptureSaver:
+    """Guarda capturas en segundo plano para que la interfaz nunca espere al disco
+
+    La codificación (cv2.imencode libera el GIL) y la escritura se hacen en un
+    pool de hilos. Si hay demasiadas capturas pendientes, las nuevas se
+    descartan en lugar de bloquear el bucle principal.
+    """
+
+    # Formato -> (extensión, parámetro de calidad de OpenCV, valor por defecto)
+    FORMATS = {
+        'jpg': ('.jpg', cv2.IMWRITE_JPEG_QUALITY, 95),
+        'png': ('.png', cv2.IMWRITE_PNG_COMPRESSION, 3),
+        'webp': ('.webp', cv2.IMWRITE_WEBP_QUALITY, 90),
+    }
+
+    def __init__(self, folder='.', fmt='jpg', quality=None, workers=2, max_pending=32):
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Formato desconocido: {fmt} (opciones: {', '.join(self.FORMATS)})")
+
+        self.folder = folder
+        self.fmt = fmt
+        extension, quality_flag, default_quality = self.FORMATS[fmt]
+        self.extension = extension
+        self.params = [quality_flag, default_quality if quality is None else quality]
+        self.max_pending = max_pending
+
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.lock = threading.Lock()
+        self.pending = 0
+
+        # Contadores
+        self.saved = 0
+        self.dropped = 0
+        self.failed = 0
+
+        # Estado de la ráfaga en curso
+        self.burst_remaining = 0
+        self.burst_interval = 0.0
+        self.burst_next_time = 0.0
+        self.burst_prefix = None
+        self.burst_index = 0
+
+    def encode_and_write(self, frame, path):
+        """Tarea del pool: codifica y escribe a disco"""
+        try:
+            ok, buffer = cv2.imencode(self.extension, frame, self.params)
+            if ok:
+                buffer.tofile(path)
+            with self.lock:
+                if ok:
+                    self.saved += 1
+                else:
+                    self.failed += 1
+        except Exception as e:
+            print(f"❌ Error guardando {path}: {e}")
+            with self.lock:
+                self.failed += 1
+        finally:
+            with self.lock:
+                self.pending -= 1
+
+    def save(self, frame, prefix='captura', name=None, copy=True):
+        """Encola una captura y devuelve la ruta (o None si se ha descartado)
+
+        Con copy=False el llamante no debe modificar el frame después.
+        """
+        with self.lock:
+            if self.pending >= self.max_pending:
+                self.dropped += 1
+                return None
+            self.pending += 1
+
+        if name is None:
+            name = f"{prefix}_{cv2.getTickCount()}"
+        path = os.path.join(self.folder, name + self.extension)
+
+        self.executor.submit(self.encode_and_write, frame.copy() if copy else frame, path)
+        return path
+
+    def start_burst(self, count, interval, prefix='rafaga'):
+        """Programa una ráfaga de count capturas separadas interval segundos"""
+        self.burst_remaining = count
+        self.burst_interval = interval
+        self.burst_next_time = time.perf_counter()
+        self.burst_prefix = f"{prefix}_{cv2.getTickCount()}"
+        self.burst_index = 0
+
+    @property
+    def burst_active(self):
+        return self.burst_remaining > 0
+
+    def update(self, frame):
+        """Llamar en cada vuelta del bucle: toma la siguiente foto de la ráfaga si toca"""
+        if self.burst_remaining <= 0 or time.perf_counter() < self.burst_next_time:
+            return None
+
+        path = self.save(frame, name=f"{self.burst_prefix}_{self.burst_index:03d}")
+        self.burst_index += 1
+        self.burst_remaining -= 1
+        now = time.perf_counter()
+        self.burst_next_time += self.burst_interval
+        if self.burst_next_time < now:
+            # El bucle va más lento que la ráfaga: no acumular disparos atrasados
+            self.burst_next_time = now + self.burst_interval
+        return path
+
+    def close(self, wait=True):
+        """Espera a que terminen las capturas pendientes y libera el pool"""
+        self.burst_remaining = 0
+        self.executor.shutdown(wait=wait)
+        return self.saved, self.dropped
@@ -0,0 +1,241 @@
+import time
+import cv2
+import numpy as np
+
+
+def compile_ranges(ranges):
+    """Normaliza rangos HSV [(lower, upper), ...] a rangos de OpenCV sin vuelta de tono
+
+    Si el H mínimo es mayor que el máximo (p. ej. rojo 150-20), el rango da la
+    vuelta al círculo de tono y se parte en [150-179] y [0-20].
+    """
+    compiled = []
+    for lower, upper in ranges:
+        lower = tuple(int(v) for v in lower)
+        upper = tuple(int(v) for v in upper)
+        if lower[0] > upper[0]:
+            compiled.append(((lower[0], lower[1], lower[2]), (179, upper[1], upper[2])))
+            compiled.append(((0, lower[1], lower[2]), (upper[0], upper[1], upper[2])))
+        else:
+            compiled.append((lower, upper))
+    return tuple((np.array(lo, np.uint8), np.array(hi, np.uint8)) for lo, hi in compiled)
+
+
+class ColorSegmenter:
+    """Máscara de uno o varios rangos HSV, recompilada solo cuando cambian los rangos
+
+    Dos métodos con el mismo resultado:
+    - 'inrange': un cvtColor a HSV y un inRange por rango, unidos con bitwise_or
+    - 'lut': tabla de 2^24 entradas BGR -> máscara, una sola indexación por píxel
+    'auto' mide ambos con el primer frame y se queda con el más rápido.
+    """
+
+    METHODS = ('inrange', 'lut')
+    TABLE_CHUNK = 1 << 20
+
+    def __init__(self, ranges=(), method='auto'):
+        self.method = method
+        self.ranges = None
+        self.compiled = ()
+        self.table = None
+        self.bgra_buffer = None
+
+        # Estadísticas
+        self.rebuilds = 0
+        self.table_ms = 0.0
+        self.timings = {}
+
+        if ranges:
+            self.set_ranges(ranges)
+
+    def set_ranges(self, ranges):
+        """Cambia los rangos; devuelve False si son los mismos y no hay nada que recompilar"""
+        key = tuple((tuple(int(v) for v in lo), tuple(int(v) for v in hi)) for lo, hi in ranges)
+        if key == self.ranges:
+            return False
+
+        self.ranges = key
+        self.compiled = compile_ranges(key)
+        self.table = None  # La tabla se rehace la próxima vez que se use
+        self.rebuilds += 1
+        return True
+
+    def _mask_hsv(self, hsv):
+        mask = None
+        for lower, upper in self.compiled:
+            part = cv2.inRange(hsv, lower, upper)
+            mask = part if mask is None else cv2.bitwise_or(mask, part, dst=mask)
+        if mask is None:
+            mask = np.zeros(hsv.shape[:2], dtype=np.uint8)
+        return mask
+
+    def build_table(self):
+        """Tabla BGR empaquetado (B | G << 8 | R << 16) -> 0/255, por bloques para no disparar la memoria"""
+        start = time.perf_counter()
+        table = np.empty(1 << 24, dtype=np.uint8)
+        for offset in range(0, 1 << 24, self.TABLE_CHUNK):
+            codes = np.arange(offset, offset + self.TABLE_CHUNK, dtype=np.uint32)
+            colors = codes.view(np.uint8).reshape(1024, -1, 4)
+            bgr = cv2.cvtColor(colors, cv2.COLOR_BGRA2BGR)
+            table[offset:offset + self.TABLE_CHUNK] = self._mask_hsv(cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV)).reshape(-1)
+        self.table = table
+        self.table_ms = (time.perf_counter() - start) * 1000
+        return table
+
+    def _segment_inrange(self, frame, hsv=None):
+        if hsv is None:
+            hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        return self._mask_hsv(hsv)
+
+    def _segment_lut(self, frame, hsv=None):
+        if self.table is None:
+            self.build_table()
+
+        h, w = frame.shape[:2]
+        if self.bgra_buffer is None or self.bgra_buffer.shape[:2] != (h, w):
+            self.bgra_buffer = np.empty((h, w, 4), dtype=np.uint8)
+
+        # BGR -> BGRA con alfa a 0: cada píxel es directamente su índice en la tabla
+        cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA, dst=self.bgra_buffer)
+        self.bgra_buffer[:, :, 3] = 0
+        return np.take(self.table, self.bgra_buffer.view(np.uint32)[:, :, 0])
+
+    def calibrate(self, frame, repeats=5):
+        """Mide ambos métodos sobre el frame actual y se queda con el más rápido"""
+        timings = {}
+        for method in self.METHODS:
+            segment = getattr(self, f'_segment_{method}')
+            segment(frame)  # La primera llamada de 'lut' construye la tabla
+            start = time.perf_counter()
+            for _ in range(repeats):
+                segment(frame)
+            timings[method] = (time.perf_counter() - start) / repeats * 1000
+
+        self.method = min(timings, key=timings.get)
+        self.timings = timings
+        if self.method != 'lut':
+            self.table = None  # No guardar 16 MB que no se van a usar
+        return timings
+
+    def segment(self, frame, hsv=None):
+        """Máscara uint8 (0/255) de los píxeles dentro de cualquiera de los rangos
+
+        hsv es opcional: si ya se tiene el frame en HSV, el método 'inrange' no lo recalcula.
+        """
+        if self.method == 'auto':
+            self.calibrate(frame)
+        return getattr(self, f'_segment_{self.method}')(frame, hsv)
+
+
+class ColorClassifier:
+    """Clasifica cada píxel en una de varias clases de color con nombre (o en ninguna)
+
+    Cada rango HSV ocupa un bit: tres LUT de 256 entradas dan, por canal, qué rangos
+    admiten ese valor de H, S y V, y el AND de las tres son los rangos que contienen
+    el píxel. Una cuarta LUT pasa esos bits a la etiqueta de la primera clase que
+    coincide. El coste no depende del número de clases (hasta 8 rangos en total).
+    Etiquetas: 0 = ninguna clase, i + 1 = clase i.
+    """
+
+    MAX_RANGES = 8
+
+    def __init__(self, classes=()):
+        self.classes = None
+        self.names = []
+        self.colors = []
+        self.labels = None
+        self.count_cache = None
+
+        # Estadísticas
+        self.rebuilds = 0
+
+        if classes:
+            self.set_classes(classes)
+
+    def set_classes(self, classes):
+        """classes: [(nombre, [(lower, upper), ...], color BGR), ...]; False si no han cambiado
+
+        Como en ColorSegmenter, un rango con H mínimo mayor que el máximo da la vuelta al tono.
+        """
+        key = tuple((name, tuple((tuple(int(v) for v in lo), tuple(int(v) for v in hi)) for lo, hi in ranges),
+                     tuple(int(c) for c in color)) for name, ranges, color in classes)
+        if key == self.classes:
+            return False
+
+        n_ranges = sum(len(ranges) for _, ranges, _ in key)
+        if n_ranges > self.MAX_RANGES:
+            raise ValueError(f"Demasiados rangos: {n_ranges} (máximo {self.MAX_RANGES})")
+
+        values = np.arange(256)
+        channel_luts = np.zeros((3, 256), dtype=np.uint8)
+        bit_class = []
+        for index, (_, ranges, _) in enumerate(key):
+            for lower, upper in ranges:
+                bit = 1 << len(bit_class)
+                for channel in range(3):
+                    lo, hi = lower[channel], upper[channel]
+                    if channel == 0 and lo > hi:
+                        inside = (values >= lo) | (values <= hi)
+                    else:
+                        inside = (values >= lo) & (values <= hi)
+                    channel_luts[channel, inside] |= bit
+                bit_class.append(index)
+
+        # Bits de rangos -> etiqueta de la primera clase (la de menor índice gana)
+        label_lut = np.zeros(256, dtype=np.uint8)
+        for bits in range(1, 256):
+            matches = [bit_class[b] for b in range(len(bit_class)) if bits & (1 << b)]
+            label_lut[bits] = min(matches) + 1 if matches else 0
+
+        # Colores para visualizar las etiquetas con applyColorMap (fondo negro)
+        palette = np.zeros((256, 1, 3), dtype=np.uint8)
+        for index, (_, _, color) in enumerate(key):
+            palette[index + 1, 0] = color
+
+        self.classes = key
+        self.names = [name for name, _, _ in key]
+        self.colors = [color for _, _, color in key]
+        self.channel_luts = channel_luts
+        self.label_lut = label_lut
+        self.palette = palette
+        self.rebuilds += 1
+        return True
+
+    def classify(self, frame, hsv=None):
+        """Imagen de etiquetas uint8 del frame (una sola pasada para todas las clases)"""
+        if hsv is None:
+            hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        h, s, v = cv2.split(hsv)
+
+        bits = cv2.LUT(h, self.channel_luts[0])
+        cv2.bitwise_and(bits, cv2.LUT(s, self.channel_luts[1]), dst=bits)
+        cv2.bitwise_and(bits, cv2.LUT(v, self.channel_luts[2]), dst=bits)
+
+        self.labels = cv2.LUT(bits, self.label_lut)
+        self.count_cache = None
+        return self.labels
+
+    def class_index(self, name):
+        if isinstance(name, int):
+            return name
+        try:
+            return self.names.index(name)
+        except ValueError:
+            raise ValueError(f"Clase desconocida: {name} (opciones: {', '.join(self.names)})") from None
+
+    def mask(self, name, labels=None):
+        """Máscara 0/255 de una clase (por nombre o índice) a partir de la última clasificación"""
+        labels = self.labels if labels is None else labels
+        return cv2.compare(labels, self.class_index(name) + 1, cv2.CMP_EQ)
+
+    def counts(self):
+        """{clase: píxeles} de la última clasificación"""
+        if self.count_cache is None:
+            hist = cv2.calcHist([self.labels], [0], None, [len(self.names) + 1], [0, len(self.names) + 1]).ravel()
+            self.count_cache = {name: int(hist[i + 1]) for i, name in enumerate(self.names)}
+        return self.count_cache
+
+    def colorize(self, labels=None):
+        """Etiquetas pintadas con el color de cada clase"""
+        labels = self.labels if labels is None else labels
+        return cv2.applyColorMap(labels, self.palette)
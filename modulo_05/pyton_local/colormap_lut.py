@@ -0,0 +1,237 @@
+import os
+import time
+import cv2
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+
+class ColormapRegistry:
+    """Registro de colormaps precalculados como LUT BGR uint8 de 256x1x3"""
+
+    def __init__(self, cache_path=None):
+        # Tablas ya calculadas: clave -> LUT (256, 1, 3) uint8 en BGR
+        self.luts = {}
+        self.cache_path = cache_path
+        self.dirty = False
+
+        if self.cache_path:
+            self.load()
+
+    @staticmethod
+    def make_key(colormap_type, colormap_data):
+        """Clave única para un colormap (también usada en el fichero .npz)"""
+        return f"{colormap_type}:{colormap_data}"
+
+    @staticmethod
+    def build_opencv_lut(colormap):
+        """Evalúa un colormap de OpenCV sobre la rampa 0..255"""
+        ramp = np.arange(256, dtype=np.uint8).reshape(256, 1)
+        return cv2.applyColorMap(ramp, colormap)
+
+    @staticmethod
+    def build_matplotlib_lut(colormap_name):
+        """Evalúa un colormap de matplotlib una sola vez sobre los 256 niveles de gris"""
+        import matplotlib.pyplot as plt
+
+        cmap = plt.get_cmap(colormap_name)
+        # Mismos valores float32 que la conversión por píxel para obtener el mismo resultado
+        normalized = np.arange(256, dtype=np.float32) / 255.0
+        colored = cmap(normalized)
+        colored_bgr = colored[:, [2, 1, 0]]
+        lut = (colored_bgr * 255).astype(np.uint8)
+        return np.ascontiguousarray(lut.reshape(256, 1, 3))
+
+    def register(self, colormap_type, colormap_data):
+        """Calcula (si hace falta) y guarda la LUT. Devuelve False si el colormap no existe"""
+        key = self.make_key(colormap_type, colormap_data)
+        if key in self.luts:
+            return True
+
+        try:
+            if colormap_type == 'opencv':
+                lut = self.build_opencv_lut(colormap_data)
+            elif colormap_type == 'matplotlib':
+                lut = self.build_matplotlib_lut(colormap_data)
+            else:
+                return False
+        except Exception:
+            return False
+
+        self.luts[key] = lut
+        self.dirty = True
+        return True
+
+    def get_lut(self, colormap_info):
+        """Devuelve la LUT de un colormap (tipo, datos, nombre), creándola si no existe"""
+        colormap_type, colormap_data = colormap_info[0], colormap_info[1]
+        key = self.make_key(colormap_type, colormap_data)
+        if key not in self.luts and not self.register(colormap_type, colormap_data):
+            return None
+        return self.luts[key]
+
+    def apply(self, gray_image, colormap_info):
+        """Aplica el colormap a una imagen en grises con una sola búsqueda en tabla"""
+        lut = self.get_lut(colormap_info)
+        if lut is None:
+            return cv2.cvtColor(gray_image, cv2.COLOR_GRAY2BGR)
+        return cv2.applyColorMap(gray_image, lut)
+
+    def load(self):
+        """Carga las LUT guardadas en disco (si existen)"""
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return 0
+
+        try:
+            with np.load(self.cache_path) as data:
+                for key in data.files:
+                    lut = data[key]
+                    if lut.shape == (256, 1, 3) and lut.dtype == np.uint8:
+                        self.luts[key] = lut
+        except Exception as e:
+            print(f"⚠️  No se pudo leer la caché de colormaps: {e}")
+            return 0
+
+        return len(self.luts)
+
+    def save(self):
+        """Guarda las LUT en disco si hay cambios pendientes"""
+        if not self.cache_path or not self.dirty:
+            return False
+
+        try:
+            np.savez(self.cache_path, **self.luts)
+        except Exception as e:
+            print(f"⚠️  No se pudo guardar la caché de colormaps: {e}")
+            return False
+
+        self.dirty = False
+        return True
+
+
+def grid_cell_views(canvas, origin, step, cell_size, rows, cols):
+    """Vista (rows, cols, h, w, 3) sobre las miniaturas de una retícula, sin copiar datos"""
+    y0, x0 = origin
+    step_y, step_x = step
+    h, w = cell_size
+
+    if y0 + (rows - 1) * step_y + h > canvas.shape[0] or x0 + (cols - 1) * step_x + w > canvas.shape[1]:
+        raise ValueError("La retícula no cabe en el lienzo")
+
+    base = canvas[y0:, x0:]
+    s0, s1, s2 = base.strides
+    return as_strided(base, shape=(rows, cols, h, w, 3),
+                      strides=(step_y * s0, step_x * s1, s0, s1, s2))
+
+
+class BatchColormapRenderer:
+    """Genera todas las miniaturas de colormap a partir de una única conversión a gris"""
+
+    METHODS = ('gather', 'lut')
+
+    def __init__(self, registry, method='auto', fill_value=0):
+        self.registry = registry
+        self.method = method
+        self.fill_value = fill_value
+
+        # Tabla apilada (slots, 256, 3) empaquetada como uint32 para una sola indexación
+        self.table_key = None
+        self.luts = []
+        self.table32 = None
+        self.offsets = None
+        self.index_buffer = None
+        self.packed_buffer = None
+        self.bgr_buffer = None
+
+        # Estadísticas de tiempo por frame
+        self.last_ms = 0.0
+        self.avg_ms = 0.0
+        self.frames = 0
+
+    def prepare(self, colormap_infos, slots):
+        """Apila las LUT de los colormaps en una tabla (slots, 256) solo cuando cambian"""
+        keys = tuple(self.registry.make_key(info[0], info[1]) for info in colormap_infos)
+        table_key = (keys, slots)
+        if table_key == self.table_key:
+            return
+
+        n_slots = int(np.prod(slots))
+        if len(colormap_infos) > n_slots:
+            raise ValueError("Hay más colormaps que celdas en la retícula")
+
+        # Las celdas sobrantes se rellenan con el color de fondo
+        identity = np.repeat(np.arange(256, dtype=np.uint8).reshape(256, 1, 1), 3, axis=2)
+        table = np.full((n_slots, 256, 4), self.fill_value, dtype=np.uint8)
+        self.luts = []
+        for i, info in enumerate(colormap_infos):
+            lut = self.registry.get_lut(info)
+            if lut is None:
+                lut = identity
+            self.luts.append(lut)
+            table[i, :, :3] = lut[:, 0]
+        table[:, :, 3] = 0
+
+        self.table32 = table.view(np.uint32).reshape(-1)
+        self.offsets = (np.arange(n_slots, dtype=np.intp) * 256).reshape(slots + (1, 1))
+        self.table_key = table_key
+        self.index_buffer = None
+
+    def _allocate(self, slots, h, w):
+        """Reserva los buffers intermedios una sola vez por tamaño de retícula"""
+        shape = slots + (h, w)
+        if self.index_buffer is None or self.index_buffer.shape != shape:
+            self.index_buffer = np.empty(shape, dtype=np.intp)
+            self.packed_buffer = np.empty(shape, dtype=np.uint32)
+            self.bgr_buffer = np.empty((int(np.prod(shape[:-1])), w, 3), dtype=np.uint8)
+
+    def _render_gather(self, gray, out):
+        """Una sola indexación NumPy sobre la tabla apilada para todas las celdas"""
+        slots = out.shape[:-3]
+        h, w = gray.shape
+        self._allocate(slots, h, w)
+
+        np.add(self.offsets, gray, out=self.index_buffer)
+        np.take(self.table32, self.index_buffer, out=self.packed_buffer, mode='wrap')
+
+        # BGRA empaquetado -> BGR y copia directa a las vistas del lienzo
+        packed = self.packed_buffer.view(np.uint8).reshape(self.bgr_buffer.shape[0], w, 4)
+        cv2.cvtColor(packed, cv2.COLOR_BGRA2BGR, dst=self.bgr_buffer)
+        out[...] = self.bgr_buffer.reshape(out.shape)
+
+    def _render_lut(self, gray, out):
+        """Una búsqueda en tabla de OpenCV por celda, reutilizando el mismo gris"""
+        slots = out.shape[:-3]
+        for i, position in enumerate(np.ndindex(*slots)):
+            if i < len(self.luts):
+                out[position] = cv2.applyColorMap(gray, self.luts[i])
+            else:
+                out[position] = self.fill_value
+
+    def calibrate(self, gray, out, repeats=5):
+        """Mide ambos métodos sobre el frame actual y se queda con el más rápido"""
+        timings = {}
+        for method in self.METHODS:
+            render = getattr(self, f'_render_{method}')
+            start = time.perf_counter()
+            for _ in range(repeats):
+                render(gray, out)
+            timings[method] = (time.perf_counter() - start) / repeats * 1000
+
+        self.method = min(timings, key=timings.get)
+        return timings
+
+    def render(self, frame, out, colormap_infos):
+        """Escribe en out (vista rows x cols x h x w x 3) todas las miniaturas de colormap"""
+        start = time.perf_counter()
+
+        gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        self.prepare(colormap_infos, out.shape[:-3])
+
+        if self.method == 'auto':
+            self.calibrate(gray, out)
+
+        getattr(self, f'_render_{self.method}')(gray, out)
+
+        self.last_ms = (time.perf_counter() - start) * 1000
+        self.frames += 1
+        self.avg_ms = self.last_ms if self.frames == 1 else 0.9 * self.avg_ms + 0.1 * self.last_ms
+        return out
@@ -0,0 +1,62 @@
+import cv2
+import numpy as np
+
+
+def build_vignette(rows, cols, sigma=200):
+    """Viñeta gaussiana uint8: 255 en el centro, oscureciendo hacia los bordes"""
+    kernel_x = cv2.getGaussianKernel(cols, sigma)
+    kernel_y = cv2.getGaussianKernel(rows, sigma)
+    kernel = kernel_y * kernel_x.T
+    # Normalizar por el máximo (con la norma L2 la máscara quedaba casi a 0 y la imagen negra)
+    return (255 * kernel / kernel.max()).astype(np.uint8)
+
+
+class MaskCache:
+    """Caché de máscaras que solo dependen de la posición (viñeta)
+
+    La clave es (tipo, alto, ancho, canales, parámetros): mientras no cambie
+    la resolución, cada máscara se construye una única vez.
+    """
+
+    BUILDERS = {
+        'vignette': build_vignette,
+    }
+
+    def __init__(self, max_entries=16):
+        self.masks = {}
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, kind, shape, channels=3, **params):
+        """Máscara de tipo kind para frames de tamaño shape (ya replicada a channels)"""
+        rows, cols = shape[:2]
+        key = (kind, rows, cols, channels, tuple(sorted(params.items())))
+
+        mask = self.masks.get(key)
+        if mask is not None:
+            self.hits += 1
+            return mask
+
+        self.misses += 1
+        mask = self.BUILDERS[kind](rows, cols, **params)
+        if channels > 1:
+            mask = cv2.merge([mask] * channels)
+
+        # Al cambiar de resolución se descartan las más antiguas
+        if len(self.masks) >= self.max_entries:
+            self.masks.pop(next(iter(self.masks)))
+        self.masks[key] = mask
+        return mask
+
+    def vignette(self, shape, sigma=200, channels=3):
+        return self.get('vignette', shape, channels, sigma=sigma)
+
+
+def colormap_vignette(gray, colormap, mask, dst=None):
+    """Colormap + viñeta sobre un único buffer de salida (sin imagen intermedia)
+
+    colormap puede ser una constante cv2.COLORMAP_* o una LUT 256x1x3.
+    """
+    colored = cv2.applyColorMap(gray, colormap, dst=dst)
+    return cv2.multiply(colored, mask, scale=1 / 255, dst=colored)
@@ -0,0 +1,300 @@
+# Pipeline multiproceso para los filtros de WebcamFilterApp
+# Los frames viajan por memoria compartida (multiprocessing.shared_memory): por las colas
+# solo pasan índices de hueco y parámetros, nunca los píxeles.
+#
+# Benchmark de escalado:
+#   py filter_pool.py synthetic:640x480:shapes --filtro Cartoon --workers 1 2 4 --frames 120
+
+import argparse
+import multiprocessing as mp
+import queue
+import time
+import traceback
+from multiprocessing import shared_memory
+import numpy as np
+
+
+def attach_shared_memory(name):
+    """Se engancha a un bloque existente sin registrarlo de nuevo en el resource tracker"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        return shared_memory.SharedMemory(name=name)
+
+
+def filter_worker(worker_id, input_names, output_names, shape, dtype, tasks, results):
+    """Proceso trabajador: lee del hueco de entrada, filtra y escribe en el de salida
+
+    Cada resultado es (hueco, secuencia, trabajador, segundos, error): si el filtro
+    falla, error lleva la traza y el proceso padre la relanza.
+    """
+    import cv2
+    from wcam_Canny3 import WebcamFilterApp
+    from striped_executor import StripedExecutor
+
+    # Un hilo de OpenCV por proceso: el paralelismo lo ponen los procesos
+    cv2.setNumThreads(1)
+    app = WebcamFilterApp(headless=True)
+    app.striped.close()
+    app.striped = StripedExecutor(1)  # Tampoco franjas en hilos dentro de cada proceso
+    blocks = [attach_shared_memory(name) for name in input_names + output_names]
+    n = len(input_names)
+    inputs = [np.ndarray(shape, dtype=dtype, buffer=b.buf) for b in blocks[:n]]
+    outputs = [np.ndarray(shape, dtype=dtype, buffer=b.buf) for b in blocks[n:]]
+
+    last_params = None
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+
+            slot, sequence, params = task
+            start = time.perf_counter()
+            try:
+                # Reconfigurar solo si cambian (buscar el filtro o parsear la cadena en cada frame sobra)
+                if params != last_params:
+                    app.configure(**params)
+                    last_params = params
+                processed = app.process_frame(inputs[slot])
+                np.copyto(outputs[slot], processed)
+            except Exception:
+                results.put((slot, sequence, worker_id, time.perf_counter() - start, traceback.format_exc()))
+                continue
+            results.put((slot, sequence, worker_id, time.perf_counter() - start, None))
+    finally:
+        del inputs, outputs
+        for block in blocks:
+            block.close()
+
+
+class MultiprocessFilterPipeline:
+    """Reparte frames entre procesos por memoria compartida y los devuelve en orden"""
+
+    def __init__(self, frame_shape, workers=2, slots=None, dtype=np.uint8):
+        self.shape = tuple(frame_shape)
+        self.dtype = np.dtype(dtype)
+        self.num_workers = workers
+        self.num_slots = slots or 2 * workers
+
+        nbytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        self.input_blocks = [shared_memory.SharedMemory(create=True, size=nbytes) for _ in range(self.num_slots)]
+        self.output_blocks = [shared_memory.SharedMemory(create=True, size=nbytes) for _ in range(self.num_slots)]
+        self.inputs = [np.ndarray(self.shape, dtype=self.dtype, buffer=b.buf) for b in self.input_blocks]
+        self.outputs = [np.ndarray(self.shape, dtype=self.dtype, buffer=b.buf) for b in self.output_blocks]
+
+        self.tasks = mp.Queue()
+        self.results = mp.Queue()
+        self.processes = []
+
+        # Estado de huecos y reordenación
+        self.free_slots = list(range(self.num_slots))
+        self.held_slot = None          # Hueco entregado al consumidor en el último poll()
+        self.finished = {}             # secuencia -> hueco terminado fuera de orden
+        self.next_sequence = 0         # Siguiente secuencia a enviar
+        self.next_output = 0           # Siguiente secuencia a entregar
+        self.submit_times = {}
+        self.error = None              # Motivo del fallo: a partir de ahí todas las llamadas lo relanzan
+
+        # Estadísticas
+        self.latencies = []
+        self.worker_times = {i: [] for i in range(workers)}
+
+    def start(self):
+        """Lanza los procesos trabajadores"""
+        input_names = [b.name for b in self.input_blocks]
+        output_names = [b.name for b in self.output_blocks]
+        for worker_id in range(self.num_workers):
+            process = mp.Process(target=filter_worker,
+                                 args=(worker_id, input_names, output_names, self.shape,
+                                       self.dtype.str, self.tasks, self.results))
+            process.daemon = True
+            process.start()
+            self.processes.append(process)
+        return self
+
+    def close(self):
+        """Para los trabajadores y libera la memoria compartida"""
+        for _ in self.processes:
+            self.tasks.put(None)
+        for process in self.processes:
+            process.join(timeout=2.0)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
+
+        self.inputs = self.outputs = []
+        for block in self.input_blocks + self.output_blocks:
+            block.close()
+            block.unlink()
+        self.input_blocks = self.output_blocks = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def in_flight(self):
+        return self.next_sequence - self.next_output
+
+    def collect(self, timeout=0.0):
+        """Recoge resultados terminados; devuelve False si no llegó ninguno"""
+        try:
+            result = self.results.get(timeout=timeout) if timeout > 0 else self.results.get_nowait()
+        except queue.Empty:
+            return False
+
+        while True:
+            slot, sequence, worker_id, elapsed, error = result
+            if error is not None:
+                self.free_slots.append(slot)
+                self.fail(f"El proceso {worker_id} falló con el frame {sequence}:\n{error}")
+            self.finished[sequence] = slot
+            self.worker_times[worker_id].append(elapsed)
+            try:
+                result = self.results.get_nowait()
+            except queue.Empty:
+                return True
+
+    def fail(self, message):
+        """Marca el pipeline como fallido: ese frame no llegará nunca y no se puede seguir en orden"""
+        self.error = message
+        raise RuntimeError(message)
+
+    def check_workers(self):
+        """Lanza RuntimeError si el pipeline falló o algún trabajador ha terminado"""
+        if self.error is not None:
+            raise RuntimeError(self.error)
+        for worker_id, process in enumerate(self.processes):
+            if not process.is_alive():
+                self.fail(f"El proceso {worker_id} terminó inesperadamente (código {process.exitcode})")
+
+    def try_submit(self, frame, params):
+        """Envía un frame si hay hueco libre; devuelve la secuencia o None"""
+        self.check_workers()
+        if not self.free_slots:
+            return None
+
+        slot = self.free_slots.pop()
+        np.copyto(self.inputs[slot], frame)
+
+        sequence = self.next_sequence
+        self.next_sequence += 1
+        self.submit_times[sequence] = time.perf_counter()
+        self.tasks.put((slot, sequence, params))
+        return sequence
+
+    def poll(self, timeout=0.0):
+        """Devuelve (secuencia, vista del frame filtrado) del siguiente en orden, o None
+
+        La vista es válida hasta la siguiente llamada a poll().
+        """
+        if self.error is not None:
+            raise RuntimeError(self.error)
+        if self.held_slot is not None:
+            self.free_slots.append(self.held_slot)
+            self.held_slot = None
+
+        if self.next_output not in self.finished:
+            if self.in_flight == 0:
+                return None
+            self.collect()
+            deadline = time.perf_counter() + timeout
+            while self.next_output not in self.finished:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self.check_workers()
+                    return None
+                # Esperas cortas para comprobar entre medias que los trabajadores siguen vivos
+                if not self.collect(timeout=min(remaining, 0.5)):
+                    self.check_workers()
+
+        sequence = self.next_output
+        slot = self.finished.pop(sequence)
+        self.next_output += 1
+        self.held_slot = slot
+        self.latencies.append(time.perf_counter() - self.submit_times.pop(sequence))
+        return sequence, self.outputs[slot]
+
+    def map(self, frames, params):
+        """Generador: filtra una secuencia de frames y los entrega en el mismo orden"""
+        for frame in frames:
+            while self.try_submit(frame, params) is None:
+                result = self.poll(timeout=1.0)
+                if result is not None:
+                    yield result
+        while self.in_flight > 0:
+            result = self.poll(timeout=1.0)
+            if result is not None:
+                yield result
+
+    def stats(self):
+        """Latencia media/p95 (ms) y tiempo medio de filtro por trabajador (ms)"""
+        latencies = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        per_worker = {
+            worker_id: (len(times), float(np.mean(times) * 1000) if times else 0.0)
+            for worker_id, times in self.worker_times.items()
+        }
+        return {
+            'latency_mean_ms': float(latencies.mean()),
+            'latency_p95_ms': float(np.percentile(latencies, 95)),
+            'per_worker': per_worker,
+        }
+
+
+def benchmark_workers(source_spec, params, worker_counts, frames=120):
+    """Mide throughput y latencia del pipeline para varios números de procesos"""
+    from frame_sources import open_source
+
+    # Mismos frames para todas las pruebas
+    source = open_source(source_spec)
+    clip = []
+    while len(clip) < frames:
+        ret, frame = source.read()
+        if not ret:
+            break
+        clip.append(frame.copy())
+    source.release()
+
+    if not clip:
+        raise IOError(f"La fuente {source_spec} no devolvió frames")
+
+    report = []
+    for workers in worker_counts:
+        with MultiprocessFilterPipeline(clip[0].shape, workers=workers) as pipeline:
+            # Calentamiento: arranque de procesos e importaciones fuera de la medida
+            for _ in pipeline.map(clip[:workers], params):
+                pass
+            pipeline.latencies.clear()
+            for times in pipeline.worker_times.values():
+                times.clear()
+
+            start = time.perf_counter()
+            count = sum(1 for _ in pipeline.map(clip, params))
+            elapsed = time.perf_counter() - start
+            stats = pipeline.stats()
+
+        report.append((workers, count / elapsed, stats))
+        print(f"⚙️  {workers} proceso(s): {count / elapsed:6.1f} fps | latencia media {stats['latency_mean_ms']:6.1f} ms "
+              f"| p95 {stats['latency_p95_ms']:6.1f} ms")
+        for worker_id, (count_w, mean_ms) in stats['per_worker'].items():
+            print(f"     - proceso {worker_id}: {count_w} frames, {mean_ms:.1f} ms/frame")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline multiproceso de filtros")
+    parser.add_argument('source', nargs='?', default='synthetic:640x480:shapes')
+    parser.add_argument('--filtro', default='Cartoon')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--frames', type=int, default=120)
+    args = parser.parse_args(argv)
+
+    print(f"🏭 Pipeline multiproceso - filtro {args.filtro}, {args.frames} frames de {args.source}")
+    benchmark_workers(args.source, {'filter_name': args.filtro}, args.workers, args.frames)
+
+
+if __name__ == "__main__":
+    main()
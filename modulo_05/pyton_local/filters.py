@@ -0,0 +1,269 @@
+# Registro declarativo de filtros y cadenas de filtros
+# Cada filtro declara su entrada (BGR o gris), sus parámetros con valores por defecto
+# y si es barato o caro. Una cadena (p. ej. "Sharpen>Cartoon>Thermal") aplica varios
+# filtros seguidos compartiendo intermedios como el gris o los bordes de Canny.
+
+import cv2
+import numpy as np
+from effects import MaskCache, colormap_vignette
+from frame_context import FrameContext
+
+
+class FilterSpec:
+    """Descripción de un filtro: función, entrada, parámetros, coste y radio
+
+    radius es cuántos píxeles de alrededor necesita cada píxel de salida (para
+    procesar por zonas con un margen); None si depende de toda la imagen.
+    """
+
+    INPUTS = ('bgr', 'gray')
+    COSTS = ('cheap', 'expensive')
+
+    def __init__(self, name, func, input='bgr', params=None, cost='cheap', aliases=(), radius=0):
+        if input not in self.INPUTS:
+            raise ValueError(f"Entrada desconocida: {input} (opciones: {', '.join(self.INPUTS)})")
+        if cost not in self.COSTS:
+            raise ValueError(f"Coste desconocido: {cost} (opciones: {', '.join(self.COSTS)})")
+
+        self.name = name
+        self.func = func
+        self.input = input
+        self.params = dict(params or {})
+        self.cost = cost
+        self.aliases = tuple(aliases)
+        self.radius = radius
+
+    def resolve(self, values=None, overrides=None):
+        """Valores por defecto <- valores de la aplicación <- valores fijos del paso
+
+        De values solo se toman los parámetros que el filtro declara.
+        """
+        params = dict(self.params)
+        if values:
+            params.update((k, v) for k, v in values.items() if k in self.params)
+        if overrides:
+            params.update(overrides)
+        return params
+
+    def apply(self, context, params):
+        image = context.gray() if self.input == 'gray' else context.frame
+        return self.func(image, params, context)
+
+
+class FilterRegistry:
+    """Filtros disponibles por nombre (sin distinguir mayúsculas) y por alias"""
+
+    def __init__(self):
+        self.filters = {}
+        self.lookup = {}
+
+    def register(self, name, input='bgr', params=None, cost='cheap', aliases=(), radius=0):
+        """Decorador: registra func(imagen, params, contexto) -> imagen BGR"""
+        def decorator(func):
+            spec = FilterSpec(name, func, input, params, cost, aliases, radius)
+            self.filters[name] = spec
+            for key in (name,) + spec.aliases:
+                self.lookup[key.lower()] = spec
+            return func
+        return decorator
+
+    def get(self, name):
+        spec = self.lookup.get(str(name).lower())
+        if spec is None:
+            raise ValueError(f"Filtro desconocido: {name} (opciones: {', '.join(self.filters)})")
+        return spec
+
+    def names(self):
+        return list(self.filters)
+
+
+class FilterChain:
+    """Secuencia de filtros aplicada sobre un mismo FrameContext"""
+
+    SEPARATOR = '>'
+
+    def __init__(self, steps, registry=None):
+        """steps: nombres de filtro o pares (nombre, parámetros fijos del paso)"""
+        self.registry = registry or filters
+        self.steps = []
+        for step in steps:
+            name, overrides = (step, {}) if isinstance(step, str) else step
+            self.steps.append((self.registry.get(name), dict(overrides)))
+
+    @classmethod
+    def parse(cls, text, registry=None):
+        """Cadena a partir de texto: "Sharpen>Cartoon>Thermal" """
+        names = [part.strip() for part in text.split(cls.SEPARATOR) if part.strip()]
+        if not names:
+            raise ValueError("Cadena de filtros vacía")
+        return cls(names, registry)
+
+    @property
+    def name(self):
+        return self.SEPARATOR.join(spec.name for spec, _ in self.steps)
+
+    @property
+    def cost(self):
+        return 'expensive' if any(spec.cost == 'expensive' for spec, _ in self.steps) else 'cheap'
+
+    @property
+    def radius(self):
+        """Suma de los radios de los pasos; None si alguno necesita la imagen completa"""
+        radii = [spec.radius for spec, _ in self.steps]
+        return None if None in radii else sum(radii)
+
+    def apply(self, frame, values=None, context=None):
+        """Aplica todos los pasos; values son los parámetros actuales de la aplicación
+
+        context permite reutilizar un FrameContext entre frames (para sus estadísticas).
+        """
+        if context is None:
+            context = FrameContext(frame)
+        else:
+            context.new_frame(frame)
+
+        for spec, overrides in self.steps:
+            context.replace(spec.apply(context, spec.resolve(values, overrides)))
+        return context.frame
+
+
+# Registro por defecto con los filtros de wcam_Canny2.py y wcam_Canny3.py
+filters = FilterRegistry()
+
+# Máscaras que solo dependen del tamaño del frame (viñeta)
+masks = MaskCache()
+
+
+@filters.register('Original')
+def original_filter(frame, params, context):
+    return frame
+
+
+# La histéresis de Canny sigue los bordes por toda la imagen: no se puede procesar por zonas
+@filters.register('Canny', input='gray', params={'canny_min': 100, 'canny_max': 200}, radius=None)
+def canny_filter(gray, params, context):
+    edges = context.edges(params['canny_min'], params['canny_max'])
+    return cv2.cvtColor(edges, cv2.COLOR_GRAY2BGR)
+
+
+@filters.register('Blur', params={'blur': 1}, radius=15)
+def blur_filter(frame, params, context):
+    return context.blurred(params['blur'])
+
+
+@filters.register('ArtisticBlur', cost='expensive', aliases=('Artistic Blur',), radius=7 + 9)
+def artistic_blur_filter(frame, params, context):
+    processed = cv2.bilateralFilter(frame, 15, 80, 80)
+    return cv2.medianBlur(processed, 19)
+
+
+SEPIA_KERNEL = np.array([[0.272, 0.534, 0.131],
+                         [0.349, 0.686, 0.168],
+                         [0.393, 0.769, 0.189]])
+
+
+@filters.register('Sepia')
+def sepia_filter(frame, params, context):
+    sepia = cv2.transform(frame, SEPIA_KERNEL)
+    return np.clip(sepia, 0, 255).astype(np.uint8)
+
+
+@filters.register('Negative', aliases=('Negativo',))
+def negative_filter(frame, params, context):
+    return 255 - frame
+
+
+@filters.register('Cartoon', cost='expensive', radius=7 + 3 + 3)
+def cartoon_filter(frame, params, context):
+    # Reducir ruido
+    bilateral = cv2.bilateralFilter(frame, 15, 40, 40)
+    # Detectar bordes sobre la imagen suavizada
+    gray = cv2.cvtColor(bilateral, cv2.COLOR_BGR2GRAY)
+    gray_blur = cv2.medianBlur(gray, 7)
+    edges = cv2.adaptiveThreshold(gray_blur, 255, cv2.ADAPTIVE_THRESH_MEAN_C,
+                                  cv2.THRESH_BINARY, 7, 7)
+    edges = cv2.cvtColor(edges, cv2.COLOR_GRAY2BGR)
+    return cv2.bitwise_and(bilateral, edges)
+
+
+@filters.register('Colormap', input='gray', params={'colormap': cv2.COLORMAP_JET},
+                  aliases=('Thermal', 'Vintage'))
+def colormap_filter(gray, params, context):
+    return cv2.applyColorMap(gray, params['colormap'])
+
+
+# La viñeta depende de la posición en el frame completo
+@filters.register('VintageThermal', input='gray', params={'sigma': 200}, aliases=('Vintage Thermal',), radius=None)
+def vintage_thermal_filter(gray, params, context):
+    # AUTUMN para un tono cálido + viñeta cacheada por tamaño
+    vignette = masks.vignette(gray.shape, sigma=params['sigma'])
+    return colormap_vignette(gray, cv2.COLORMAP_AUTUMN, vignette)
+
+
+@filters.register('Neon', params={'neon_min': 50, 'neon_max': 150}, radius=None)
+def neon_filter(frame, params, context):
+    edges = context.edges(params['neon_min'], params['neon_max'])
+    return cv2.applyColorMap(edges, cv2.COLORMAP_HOT)
+
+
+@filters.register('HueColormap', params={'colormap': cv2.COLORMAP_JET}, aliases=('HSV',))
+def hue_colormap_filter(frame, params, context):
+    return cv2.applyColorMap(context.hsv()[:, :, 0], params['colormap'])
+
+
+@filters.register('Psychedelic')
+def psychedelic_filter(frame, params, context):
+    # Rotar los canales y mezclar con RAINBOW
+    b, g, r = cv2.split(frame)
+    rotated = cv2.merge([r, b, g])
+    gray = cv2.cvtColor(rotated, cv2.COLOR_BGR2GRAY)
+    rainbow = cv2.applyColorMap(gray, cv2.COLORMAP_RAINBOW)
+    return cv2.addWeighted(rotated, 0.6, rainbow, 0.4, 0)
+
+
+@filters.register('OilPaint', cost='expensive', aliases=('Oil Paint',), radius=3 * 4)
+def oil_paint_filter(frame, params, context):
+    processed = frame
+    for _ in range(3):
+        processed = cv2.bilateralFilter(processed, 9, 200, 200)
+    # SUMMER para tonos cálidos
+    gray = cv2.cvtColor(processed, cv2.COLOR_BGR2GRAY)
+    summer = cv2.applyColorMap(gray, cv2.COLORMAP_SUMMER)
+    return cv2.addWeighted(processed, 0.8, summer, 0.2, 0)
+
+
+EMBOSS_KERNEL = np.array([[-2, -1, 0],
+                          [-1, 1, 1],
+                          [0, 1, 2]], dtype=np.float32)
+
+
+@filters.register('Emboss', input='gray', radius=1)
+def emboss_filter(gray, params, context):
+    emboss = cv2.filter2D(gray, -1, EMBOSS_KERNEL) + 128
+    emboss = np.clip(emboss, 0, 255).astype(np.uint8)
+    return cv2.applyColorMap(emboss, cv2.COLORMAP_BONE)
+
+
+SHARPEN_KERNEL = np.array([[-1, -1, -1], [-1, 9, -1], [-1, -1, -1]])
+
+
+@filters.register('Sharpen', radius=1)
+def sharpen_filter(frame, params, context):
+    return cv2.filter2D(frame, -1, SHARPEN_KERNEL)
+
+
+# Filtros de wcam_Canny2.py: (nombre mostrado, pasos de la cadena)
+CANNY2_FILTERS = [
+    ("Original", ["Original"]),
+    ("Canny Edge Detection", ["Canny"]),
+    ("Artistic Blur", ["ArtisticBlur"]),
+    ("Sepia", ["Sepia"]),
+    ("Negative", ["Negative"]),
+    ("Cartoon", ["Cartoon"]),
+    ("Vintage Thermal", ["VintageThermal"]),
+    ("Neon Glow", ["Neon"]),
+    ("Thermal Vision", [("Colormap", {'colormap': cv2.COLORMAP_JET})]),
+    ("Psychedelic", ["Psychedelic"]),
+    ("Oil Paint", ["OilPaint"]),
+    ("Emboss 3D", ["Emboss"]),
+]
@@ -0,0 +1,211 @@
+import threading
+import time
+from collections import deque
+import numpy as np
+
+
+class FrameRingBuffer:
+    """Anillo de N frames preasignados con entrega sin bloqueos del último frame
+
+    El escritor rellena un hueco libre y lo publica en la cola de listos; el
+    lector se queda con el más reciente y devuelve los anteriores a la cola de
+    libres. Las operaciones de deque son atómicas, así que no hace falta lock.
+    """
+
+    def __init__(self, shape, slots=3, dtype=np.uint8):
+        if slots < 3:
+            raise ValueError("Se necesitan al menos 3 huecos (escritor, listo y lector)")
+
+        self.shape = tuple(shape)
+        self.slots = [np.empty(self.shape, dtype=dtype) for _ in range(slots)]
+        self.sequences = [0] * slots
+        self.timestamps = [0.0] * slots
+
+        self.free = deque(range(slots))
+        self.ready = deque()
+        self.front = None  # Hueco que tiene el lector
+
+        # Contadores (cada uno lo modifica un solo hilo)
+        self.sequence = 0
+        self.overwritten = 0  # Frames listos que el escritor tuvo que reutilizar
+        self.skipped = 0      # Frames listos que el lector saltó por llegar tarde
+
+    @property
+    def dropped(self):
+        """Frames capturados que nunca llegaron a consumirse"""
+        return self.overwritten + self.skipped
+
+    def acquire(self):
+        """Devuelve un hueco libre para escribir (roba el listo más antiguo si no hay)
+
+        Mientras latest() mueve huecos de listos a libres las dos colas pueden
+        verse vacías un instante: se reintenta hasta conseguir uno.
+        """
+        while True:
+            try:
+                return self.free.popleft()
+            except IndexError:
+                pass
+
+            # El lector va retrasado: se descarta el frame listo más antiguo
+            try:
+                idx = self.ready.popleft()
+            except IndexError:
+                time.sleep(0)  # Ceder el GIL al lector para que termine de devolver huecos
+                continue
+            self.overwritten += 1
+            return idx
+
+    def publish(self, idx, timestamp=None):
+        """Marca el hueco como listo con un nuevo número de secuencia"""
+        self.sequence += 1
+        self.sequences[idx] = self.sequence
+        self.timestamps[idx] = time.perf_counter() if timestamp is None else timestamp
+        self.ready.append(idx)
+
+    def release(self, idx):
+        """Devuelve un hueco sin publicarlo (lectura fallida)"""
+        self.free.append(idx)
+
+    def latest(self):
+        """Devuelve (secuencia, vista del frame) del más reciente, sin copiar
+
+        La vista es válida hasta la siguiente llamada a latest().
+        """
+        try:
+            idx = self.ready.pop()
+        except IndexError:
+            idx = None
+
+        if idx is not None:
+            # Los frames listos más antiguos no se llegaron a consumir
+            while True:
+                try:
+                    old = self.ready.popleft()
+                except IndexError:
+                    break
+                self.skipped += 1
+                self.free.append(old)
+
+            if self.front is not None:
+                self.free.append(self.front)
+            self.front = idx
+
+        if self.front is None:
+            return 0, None
+        return self.sequences[self.front], self.slots[self.front]
+
+
+class LatestFrameCapture:
+    """Hilo de captura que lee la cámara directamente sobre un FrameRingBuffer"""
+
+    def __init__(self, cap, slots=3, max_failures=10):
+        self.cap = cap
+        self.num_slots = slots
+        self.max_failures = max_failures
+        self.ring = None
+
+        self.running = False
+        self.failed = False
+        self.thread = None
+
+        # Estadísticas
+        self.fps = 0.0
+        self.last_timestamp = None
+
+    def start(self):
+        """Arranca el hilo de captura"""
+        self.running = True
+        self.thread = threading.Thread(target=self.capture_loop)
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Detiene el hilo de captura"""
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+
+    @property
+    def sequence(self):
+        return self.ring.sequence if self.ring else 0
+
+    @property
+    def dropped(self):
+        return self.ring.dropped if self.ring else 0
+
+    def read_into(self, slot):
+        """Lee de la cámara sobre el hueco indicado; devuelve False si falla"""
+        ret, image = self.cap.read(image=slot)
+        if not ret or image is None:
+            return False
+
+        # Algunos backends ignoran el buffer de salida y devuelven un array nuevo
+        if image is not slot:
+            if image.shape != slot.shape:
+                return False
+            np.copyto(slot, image)
+        return True
+
+    def update_fps(self, timestamp):
+        """Media móvil de los FPS reales de la cámara"""
+        if self.last_timestamp is not None:
+            elapsed = timestamp - self.last_timestamp
+            if elapsed > 0:
+                current = 1.0 / elapsed
+                self.fps = current if self.fps == 0 else 0.9 * self.fps + 0.1 * current
+        self.last_timestamp = timestamp
+
+    def capture_loop(self):
+        """Lee frames al ritmo que marque la cámara (cap.read ya bloquea)"""
+        consecutive_failures = 0
+
+        while self.running and self.cap and self.cap.isOpened():
+            idx = None
+            try:
+                if self.ring is None:
+                    # El primer frame define el tamaño de los huecos
+                    ret, frame = self.cap.read()
+                    if ret and frame is not None:
+                        self.ring = FrameRingBuffer(frame.shape, self.num_slots, frame.dtype)
+                        idx = self.ring.acquire()
+                        np.copyto(self.ring.slots[idx], frame)
+                        ok = True
+                    else:
+                        ok = False
+                else:
+                    idx = self.ring.acquire()
+                    ok = self.read_into(self.ring.slots[idx])
+                    if not ok:
+                        self.ring.release(idx)
+                        idx = None
+
+                if ok:
+                    timestamp = time.perf_counter()
+                    self.ring.publish(idx, timestamp)
+                    idx = None
+                    self.update_fps(timestamp)
+                    consecutive_failures = 0
+                else:
+                    consecutive_failures += 1
+                    if consecutive_failures > self.max_failures:
+                        print("⚠️  Demasiados fallos de captura, cambiando a modo demo")
+                        self.failed = True
+                        break
+
+            except Exception as e:
+                if idx is not None:
+                    self.ring.release(idx)
+                consecutive_failures += 1
+                print(f"Error en captura: {e}")
+                if consecutive_failures > self.max_failures:
+                    self.failed = True
+                    break
+                time.sleep(0.1)
+
+    def latest(self):
+        """Devuelve (secuencia, vista del último frame) o (0, None) si aún no hay"""
+        if self.ring is None:
+            return 0, None
+        return self.ring.latest()
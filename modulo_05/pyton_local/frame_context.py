@@ -0,0 +1,67 @@
+import cv2
+
+
+class FrameContext:
+    """Representaciones derivadas del frame actual, calculadas bajo demanda una sola vez
+
+    gray(), hsv(), blurred(k) y edges(t1, t2) se memorizan hasta que llega un
+    frame nuevo (new_frame). hits cuenta las conversiones que se han ahorrado.
+    """
+
+    def __init__(self, frame=None):
+        self.frame = frame
+        self.cache = {}
+
+        # Estadísticas
+        self.hits = 0
+        self.misses = 0
+        self.frames = 0 if frame is None else 1
+
+    def new_frame(self, frame):
+        """Frame nuevo de la fuente: siempre invalida (el buffer puede ser el mismo objeto)"""
+        self.frame = frame
+        self.cache.clear()
+        self.frames += 1
+
+    def replace(self, frame):
+        """Resultado intermedio de una cadena: invalida solo si la imagen ha cambiado"""
+        if frame is not self.frame:
+            self.frame = frame
+            self.cache.clear()
+
+    def get(self, key, compute):
+        """Devuelve cache[key] o lo calcula con compute() la primera vez
+
+        El resultado es compartido: quien lo use no debe modificarlo.
+        """
+        value = self.cache.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = self.cache[key] = compute()
+        return value
+
+    def gray(self):
+        return self.get('gray', lambda: cv2.cvtColor(self.frame, cv2.COLOR_BGR2GRAY))
+
+    def hsv(self):
+        return self.get('hsv', lambda: cv2.cvtColor(self.frame, cv2.COLOR_BGR2HSV))
+
+    def blurred(self, ksize, source='bgr'):
+        """GaussianBlur (ksize x ksize) del frame en color o del gris"""
+        def compute():
+            image = self.gray() if source == 'gray' else self.frame
+            return cv2.GaussianBlur(image, (ksize, ksize), 0)
+        return self.get(('blur', source, ksize), compute)
+
+    def edges(self, threshold1, threshold2):
+        return self.get(('edges', threshold1, threshold2),
+                        lambda: cv2.Canny(self.gray(), threshold1, threshold2))
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'frames': self.frames, 'hits': self.hits, 'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
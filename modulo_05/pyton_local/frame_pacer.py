@@ -0,0 +1,59 @@
+import math
+import time
+
+
+class FramePacer:
+    """Decide cuándo redibujar y cuánto esperar en cv2.waitKey
+
+    Solo se redibuja si cambia la clave de render (frame nuevo o estado de la
+    interfaz) y nunca más rápido que target_fps. El tiempo de espera de waitKey
+    es lo que queda del presupuesto del frame, así el bucle no gira en vacío
+    cuando la cámara o la escena van lentas.
+    """
+
+    def __init__(self, target_fps=30.0, max_poll_ms=5):
+        self.max_poll_ms = max_poll_ms
+        self.set_target_fps(target_fps)
+
+        self.last_key = None
+        self.next_render = 0.0
+
+        # Estadísticas
+        self.rendered = 0
+        self.skipped = 0
+
+    def set_target_fps(self, fps):
+        self.target_fps = max(1.0, float(fps))
+        self.frame_budget = 1.0 / self.target_fps
+
+    def should_render(self, render_key):
+        """True si hay algo nuevo que mostrar y ya se ha cumplido el presupuesto del frame"""
+        if render_key == self.last_key or time.perf_counter() < self.next_render:
+            self.skipped += 1
+            return False
+        return True
+
+    def begin(self, render_key):
+        """Marca el inicio de un redibujado"""
+        now = time.perf_counter()
+        self.last_key = render_key
+        # Mantener la cadencia; si se ha quedado atrás (p. ej. tras una pausa), empezar desde ahora
+        self.next_render += self.frame_budget
+        if self.next_render <= now:
+            self.next_render = now + self.frame_budget
+        self.rendered += 1
+
+    def invalidate(self):
+        """Fuerza un redibujado en la siguiente vuelta"""
+        self.last_key = None
+
+    def wait_ms(self):
+        """Milisegundos para waitKey: lo que falta hasta el siguiente render permitido
+
+        Si ya se puede redibujar pero no hay nada nuevo, se sondea en intervalos cortos.
+        """
+        remaining_ms = (self.next_render - time.perf_counter()) * 1000
+        poll_ms = max(1, min(self.max_poll_ms, int(self.frame_budget * 250)))
+        if remaining_ms <= 0:
+            return poll_ms
+        return max(1, int(math.ceil(remaining_ms)))
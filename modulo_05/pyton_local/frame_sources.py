@@ -0,0 +1,327 @@
+import os
+import time
+import cv2
+import numpy as np
+
+
+class FrameSource:
+    """Fuente de frames con la misma interfaz que cv2.VideoCapture
+
+    Todas las apps usan solo isOpened(), read(), release(), get() y set(),
+    así que cualquier fuente puede sustituir a la webcam sin tocar su código.
+    """
+
+    name = "source"
+
+    def __init__(self, fps=0.0, realtime=False):
+        # fps nominal de la fuente; con realtime=True se respeta ese ritmo
+        self.fps = fps
+        self.realtime = realtime
+        self.frame_index = 0
+        self.next_frame_time = None
+
+    def isOpened(self):
+        return False
+
+    def grab_frame(self, image):
+        """Devuelve el siguiente frame (o None al terminar); puede escribir en image"""
+        raise NotImplementedError
+
+    def pace(self):
+        """Espera lo necesario para simular el ritmo real de la fuente"""
+        if not self.realtime or self.fps <= 0:
+            return
+        now = time.perf_counter()
+        if self.next_frame_time is None:
+            self.next_frame_time = now
+        delay = self.next_frame_time - now
+        if delay > 0:
+            time.sleep(delay)
+        self.next_frame_time = max(self.next_frame_time, now) + 1.0 / self.fps
+
+    def read(self, image=None):
+        """Lee el siguiente frame, reutilizando image si tiene el tamaño correcto"""
+        if not self.isOpened():
+            return False, None
+
+        frame = self.grab_frame(image)
+        if frame is None:
+            return False, None
+
+        self.pace()
+        self.frame_index += 1
+
+        if image is not None and frame is not image and image.shape == frame.shape and image.dtype == frame.dtype:
+            np.copyto(image, frame)
+            return True, image
+        return True, frame
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return float(self.fps)
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.frame_index)
+        return 0.0
+
+    def set(self, prop, value):
+        return False
+
+    def release(self):
+        pass
+
+
+class WebcamSource(FrameSource):
+    """Webcam a través de cv2.VideoCapture"""
+
+    name = "webcam"
+
+    BACKENDS = [
+        (cv2.CAP_DSHOW, "DirectShow"),
+        (cv2.CAP_MSMF, "Media Foundation"),
+        (cv2.CAP_V4L2, "Video4Linux"),
+        (cv2.CAP_ANY, "Default")
+    ]
+
+    def __init__(self, index=0, backend=cv2.CAP_ANY, cap=None):
+        super().__init__()
+        self.index = index
+        self.cap = cap if cap is not None else cv2.VideoCapture(index, backend)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) if self.cap.isOpened() else 0.0
+
+    @classmethod
+    def probe(cls, index=0, width=640, height=480, fps=15):
+        """Prueba los backends disponibles y devuelve la primera webcam que funcione"""
+        for backend, name in cls.BACKENDS:
+            try:
+                print(f"🔍 Probando backend {name}...")
+                cap = cv2.VideoCapture(index, backend)
+
+                if cap.isOpened():
+                    # Configurar propiedades para estabilidad
+                    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+                    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+                    cap.set(cv2.CAP_PROP_FPS, fps)
+                    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+                    # Probar captura
+                    ret, frame = cap.read()
+                    if ret and frame is not None:
+                        print(f"✅ Backend {name} funcionando")
+                        return cls(index, backend, cap=cap)
+                    else:
+                        cap.release()
+
+            except Exception as e:
+                print(f"❌ Backend {name} falló: {e}")
+                continue
+
+        print("⚠️  No se pudo inicializar ninguna webcam")
+        return None
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self, image=None):
+        # La cámara ya marca el ritmo: se delega directamente en VideoCapture
+        return self.cap.read(image=image)
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def set(self, prop, value):
+        return self.cap.set(prop, value)
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource(FrameSource):
+    """Vídeo grabado; por defecto se lee a máxima velocidad"""
+
+    name = "video"
+
+    def __init__(self, path, loop=False, realtime=False):
+        self.path = path
+        self.loop = loop
+        self.cap = cv2.VideoCapture(path)
+        super().__init__(self.cap.get(cv2.CAP_PROP_FPS) or 30.0, realtime)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def grab_frame(self, image):
+        ret, frame = self.cap.read(image=image)
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read(image=image)
+        return frame if ret else None
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def set(self, prop, value):
+        return self.cap.set(prop, value)
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageFolderSource(FrameSource):
+    """Carpeta de imágenes leídas en orden alfabético"""
+
+    name = "images"
+
+    EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff', '.webp')
+
+    def __init__(self, folder, fps=30.0, loop=True, realtime=False):
+        super().__init__(fps, realtime)
+        self.folder = folder
+        self.loop = loop
+        self.files = sorted(
+            os.path.join(folder, f) for f in os.listdir(folder)
+            if f.lower().endswith(self.EXTENSIONS)
+        )
+        self.position = 0
+
+    def isOpened(self):
+        return len(self.files) > 0
+
+    def grab_frame(self, image):
+        if self.position >= len(self.files):
+            if not self.loop:
+                return None
+            self.position = 0
+
+        frame = cv2.imread(self.files[self.position], cv2.IMREAD_COLOR)
+        self.position += 1
+        return frame
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(len(self.files))
+        return super().get(prop)
+
+
+class SyntheticSource(FrameSource):
+    """Patrones sintéticos deterministas para pruebas sin cámara"""
+
+    name = "synthetic"
+
+    PATTERNS = ('demo', 'gradient', 'noise', 'shapes')
+
+    def __init__(self, width=640, height=480, pattern='demo', fps=30.0, frames=None, seed=0, realtime=False):
+        super().__init__(fps, realtime)
+        if pattern not in self.PATTERNS:
+            raise ValueError(f"Patrón desconocido: {pattern} (opciones: {', '.join(self.PATTERNS)})")
+
+        self.width = width
+        self.height = height
+        self.pattern = pattern
+        self.frames = frames  # None = infinito
+        self.seed = seed
+
+        # Base fija; cada frame se obtiene desplazándola para que haya movimiento
+        self.base = self.make_base()
+
+    def make_base(self):
+        """Imagen base del patrón (se calcula una sola vez)"""
+        h, w = self.height, self.width
+
+        if self.pattern == 'noise':
+            rng = np.random.default_rng(self.seed)
+            return rng.integers(0, 256, (h, w, 3), dtype=np.uint8)
+
+        # Gradiente horizontal como en la imagen de demostración
+        ramp = (np.arange(w) * 255 // w).astype(np.uint8)
+        img = np.empty((h, w, 3), dtype=np.uint8)
+        img[:, :, 0] = ramp
+        img[:, :, 1] = 128
+        img[:, :, 2] = 255 - ramp
+
+        if self.pattern == 'demo':
+            center = (w // 2, h // 2)
+            for radius in range(50, min(h, w) // 2 - 40, 30):
+                cv2.circle(img, center, radius, (255, 255, 255), 2)
+            cv2.putText(img, "DEMO IMAGE", (w // 2 - 70, h // 2), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+        elif self.pattern == 'shapes':
+            rng = np.random.default_rng(self.seed)
+            for _ in range(12):
+                x, y = int(rng.integers(0, w)), int(rng.integers(0, h))
+                size = int(rng.integers(10, max(11, min(h, w) // 6)))
+                color = tuple(int(c) for c in rng.integers(0, 256, 3))
+                if rng.random() < 0.5:
+                    cv2.circle(img, (x, y), size, color, -1)
+                else:
+                    cv2.rectangle(img, (x, y), (x + size, y + size), color, -1)
+
+        return img
+
+    def isOpened(self):
+        return self.frames is None or self.frame_index < self.frames
+
+    def grab_frame(self, image):
+        if self.frames is not None and self.frame_index >= self.frames:
+            return None
+
+        if image is None or image.shape != self.base.shape:
+            image = np.empty_like(self.base)
+
+        # Desplazamiento horizontal circular: movimiento determinista sin recalcular
+        shift = (self.frame_index * 4) % self.width
+        if shift == 0:
+            np.copyto(image, self.base)
+        else:
+            image[:, :shift] = self.base[:, -shift:]
+            image[:, shift:] = self.base[:, :-shift]
+        return image
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(self.frames or 0)
+        return super().get(prop)
+
+
+def open_source(spec=0, realtime=False, loop=None):
+    """Crea una fuente a partir de un texto de línea de comandos
+
+    - 0, 1, ...                    -> webcam con ese índice
+    - carpeta                      -> ImageFolderSource
+    - fichero de vídeo             -> VideoFileSource
+    - synthetic[:ANCHOxALTO[:patrón]] -> SyntheticSource (p. ej. synthetic:1280x720:noise)
+
+    loop None deja el comportamiento de cada fuente (las carpetas se repiten en
+    bucle, los vídeos no); True o False lo fuerza para carpetas y vídeos.
+    """
+    if isinstance(spec, FrameSource):
+        return spec
+
+    spec = str(spec)
+
+    if spec.isdigit():
+        return WebcamSource(int(spec))
+
+    if spec.startswith('synthetic'):
+        parts = spec.split(':')
+        width, height, pattern = 640, 480, 'demo'
+        if len(parts) > 1 and parts[1]:
+            width, height = (int(v) for v in parts[1].lower().split('x'))
+        if len(parts) > 2 and parts[2]:
+            pattern = parts[2]
+        return SyntheticSource(width, height, pattern, realtime=realtime)
+
+    if os.path.isdir(spec):
+        return ImageFolderSource(spec, realtime=realtime, loop=True if loop is None else loop)
+
+    if os.path.isfile(spec):
+        return VideoFileSource(spec, realtime=realtime, loop=bool(loop))
+
+    raise ValueError(f"No se reconoce la fuente de vídeo: {spec}")
+
+
+def source_from_argv(argv, default=0):
+    """Fuente indicada como primer argumento del script (webcam 0 si no hay)"""
+    return open_source(argv[1] if len(argv) > 1 else default)
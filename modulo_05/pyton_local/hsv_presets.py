@@ -0,0 +1,167 @@
+import json
+import os
+import numpy as np
+from color_segmentation import ColorSegmenter
+
+
+class PresetStore:
+    """Presets con nombre del detector de color guardados en JSON
+
+    Cada preset guarda el rango HSV, el modo de vista y la limpieza morfológica.
+    Junto al JSON se guarda una caché .npz con lo ya compilado de cada rango: el
+    método elegido por la calibración y, si es 'lut', la tabla BGR -> máscara
+    empaquetada en bits, para que al arrancar o cambiar de preset no haya que
+    medir ni construir nada.
+    """
+
+    DEFAULTS = {
+        'lower': [0, 0, 0],
+        'upper': [179, 255, 255],
+        'vista': 0,
+        'kernel': 3,
+        'open': True,
+        'close': True,
+    }
+
+    def __init__(self, path='presets_color.json', cache_path=None):
+        self.path = path
+        self.cache_path = cache_path or os.path.splitext(path)[0] + '_luts.npz'
+        self.presets = {}
+        self.active = None
+        self.dirty = False
+
+        # Segmentadores ya compilados por rango: cambiar de preset no recompila
+        self.segmenters = {}
+        self.cached_methods = {}
+        self.cached_tables = {}
+
+        self.load()
+
+    @staticmethod
+    def range_key(preset):
+        return "{}-{}".format(','.join(map(str, preset['lower'])), ','.join(map(str, preset['upper'])))
+
+    def load(self):
+        """Carga los presets y la caché de tablas (si existen)"""
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    data = json.load(f)
+                self.presets = {name: dict(self.DEFAULTS, **preset) for name, preset in data.get('presets', {}).items()}
+                self.active = data.get('active') if data.get('active') in self.presets else None
+                self.cached_methods = dict(data.get('methods', {}))
+            except Exception as e:
+                print(f"⚠️  No se pudieron leer los presets: {e}")
+
+        if os.path.exists(self.cache_path):
+            try:
+                with np.load(self.cache_path) as data:
+                    self.cached_tables = {key: data[key] for key in data.files}
+            except Exception as e:
+                print(f"⚠️  No se pudo leer la caché de tablas: {e}")
+
+        return len(self.presets)
+
+    def save(self):
+        """Guarda los presets y lo compilado de sus rangos si hay cambios pendientes"""
+        self.collect_compiled()
+        if not self.dirty:
+            return False
+
+        keys = {self.range_key(preset) for preset in self.presets.values()}
+        data = {
+            'active': self.active,
+            'presets': self.presets,
+            'methods': {key: method for key, method in self.cached_methods.items() if key in keys},
+        }
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=1)
+            tables = {key: bits for key, bits in self.cached_tables.items() if key in keys}
+            if tables:
+                np.savez_compressed(self.cache_path, **tables)
+        except Exception as e:
+            print(f"⚠️  No se pudieron guardar los presets: {e}")
+            return False
+
+        self.dirty = False
+        return True
+
+    def names(self):
+        return list(self.presets)
+
+    def get(self, name=None):
+        name = self.active if name is None else name
+        return self.presets.get(name)
+
+    def put(self, name, lower, upper, vista=0, kernel=3, morph_open=True, morph_close=True):
+        """Crea o sobrescribe un preset y lo deja activo"""
+        self.presets[name] = {
+            'lower': [int(v) for v in lower],
+            'upper': [int(v) for v in upper],
+            'vista': int(vista),
+            'kernel': int(kernel),
+            'open': bool(morph_open),
+            'close': bool(morph_close),
+        }
+        self.active = name
+        self.dirty = True
+        return self.presets[name]
+
+    def new_name(self):
+        index = len(self.presets) + 1
+        while f"preset_{index}" in self.presets:
+            index += 1
+        return f"preset_{index}"
+
+    def select(self, name):
+        if name not in self.presets:
+            raise ValueError(f"Preset desconocido: {name} (opciones: {', '.join(self.presets)})")
+        if name != self.active:
+            self.active = name
+            self.dirty = True
+        return self.presets[name]
+
+    def next(self):
+        """Activa el siguiente preset (en orden de creación) y lo devuelve"""
+        names = self.names()
+        if not names:
+            return None
+        index = (names.index(self.active) + 1) % len(names) if self.active in names else 0
+        return self.select(names[index])
+
+    def segmenter(self, name=None):
+        """ColorSegmenter del preset, reutilizado y con la compilación de la caché si la hay"""
+        preset = self.get(name)
+        key = self.range_key(preset)
+        segmenter = self.segmenters.get(key)
+        if segmenter is None:
+            method = self.cached_methods.get(key, 'auto')
+            segmenter = ColorSegmenter([(preset['lower'], preset['upper'])], method=method)
+            if method == 'lut' and key in self.cached_tables:
+                segmenter.table = np.unpackbits(self.cached_tables[key]) * np.uint8(255)
+            self.segmenters[key] = segmenter
+        return segmenter
+
+    def remember(self, segmenter):
+        """Reutiliza un segmentador ya calibrado (p. ej. el de las barras al guardar un preset)"""
+        lower, upper = segmenter.ranges[0]
+        self.segmenters[self.range_key({'lower': lower, 'upper': upper})] = segmenter
+
+    def collect_compiled(self):
+        """Pasa a la caché el método (y la tabla) de los segmentadores ya calibrados"""
+        for key, segmenter in self.segmenters.items():
+            lower, upper = segmenter.ranges[0]
+            if segmenter.method == 'auto' or self.range_key({'lower': lower, 'upper': upper}) != key:
+                continue  # Sin calibrar, o movido con las barras a otro rango
+            if self.cached_methods.get(key) != segmenter.method:
+                self.cached_methods[key] = segmenter.method
+                self.dirty = True
+            if segmenter.method == 'lut' and segmenter.table is not None and key not in self.cached_tables:
+                self.cached_tables[key] = np.packbits(segmenter.table > 0)
+                self.dirty = True
+
+    @staticmethod
+    def kernel(preset):
+        size = max(1, int(preset['kernel']))
+        return np.ones((size, size), np.uint8)
@@ -0,0 +1,59 @@
+import cv2
+import numpy as np
+
+
+class ColorAdjuster:
+    """Brillo, contraste y saturación en una sola etapa
+
+    - Con los valores neutros (0, 100%, 100%) no se hace nada.
+    - Brillo/contraste sigue siendo convertScaleAbs (una pasada SIMD, más rápida
+      que cv2.LUT sobre 3 canales), pero se omite si es la identidad.
+    - La saturación aplica una LUT de 256 entradas solo al canal S, sin
+      aritmética en coma flotante por píxel.
+    La LUT de saturación solo se recalcula cuando cambia su trackbar.
+    """
+
+    def __init__(self):
+        self.ramp = np.arange(256, dtype=np.uint8).reshape(256, 1)
+
+        self.saturation_key = None
+        self.saturation_lut = None
+
+        # Veces que se ha recalculado la LUT
+        self.rebuilds = 0
+
+    @staticmethod
+    def is_neutral(brightness, contrast, saturation):
+        return brightness == 0 and contrast == 100 and saturation == 100
+
+    def get_saturation_lut(self, saturation):
+        """LUT del canal S: escala y satura a 255 (sin desbordar por encima de 100%)"""
+        if saturation != self.saturation_key:
+            factor = saturation / 100.0
+            self.saturation_lut = np.clip(self.ramp * factor, 0, 255).astype(np.uint8)
+            self.saturation_key = saturation
+            self.rebuilds += 1
+        return self.saturation_lut
+
+    def brightness_contrast(self, frame, brightness, contrast):
+        """Solo brillo/contraste (nada si es neutro)"""
+        if brightness == 0 and contrast == 100:
+            return frame
+        return cv2.convertScaleAbs(frame, alpha=contrast / 100.0, beta=brightness)
+
+    def saturation(self, frame, saturation):
+        """Solo saturación: BGR -> HSV -> LUT de S -> BGR (o nada si es 100%)"""
+        if saturation == 100:
+            return frame
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        s = cv2.extractChannel(hsv, 1)
+        cv2.LUT(s, self.get_saturation_lut(saturation), dst=s)
+        cv2.insertChannel(s, hsv, 1)
+        return cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
+
+    def apply(self, frame, brightness, contrast, saturation):
+        """Etapa completa de ajustes; devuelve el mismo frame si todo es neutro"""
+        if self.is_neutral(brightness, contrast, saturation):
+            return frame
+        frame = self.brightness_contrast(frame, brightness, contrast)
+        return self.saturation(frame, saturation)
@@ -0,0 +1,113 @@
+import time
+import cv2
+import numpy as np
+
+
+class TileIncrementalFilter:
+    """Vuelve a filtrar solo las teselas que han cambiado desde la última vez
+
+    El frame se divide en teselas de tile x tile. Una tesela está sucia si tiene
+    al menos min_pixels píxeles cuya diferencia (máximo de los tres canales) con
+    la entrada usada la última vez que se filtró supera threshold. Las teselas
+    sucias de una misma fila se agrupan en tramos; cada tramo se filtra con un
+    margen de halo píxeles alrededor (el radio del filtro) y solo su interior se
+    copia en la salida anterior. Las teselas a menos de halo píxeles de un cambio
+    también se marcan sucias. Con halo >= radio el resultado es el mismo que
+    filtrando el frame completo (salvo las diferencias por debajo de threshold).
+    """
+
+    def __init__(self, tile=64, threshold=12, min_pixels=8):
+        self.tile = tile
+        self.threshold = threshold
+        self.min_pixels = min_pixels
+
+        self.reference = None  # Entrada con la que se calculó cada tesela de la salida
+        self.output = None
+        self.key = None
+
+        # Estadísticas
+        self.last_fraction = 1.0
+        self.avg_fraction = 1.0
+        self.frames = 0
+        self.last_ms = 0.0
+
+    def reset(self):
+        """Olvida la salida anterior: el siguiente frame se procesa entero"""
+        self.reference = None
+        self.output = None
+        self.key = None
+
+    def grid(self, shape):
+        h, w = shape[:2]
+        return -(-h // self.tile), -(-w // self.tile)
+
+    def dirty_tiles(self, frame):
+        """Matriz booleana (filas, columnas) de teselas que han cambiado"""
+        diff = cv2.absdiff(frame, self.reference)
+        if diff.ndim == 3:
+            b, g, r = cv2.split(diff)
+            diff = cv2.max(cv2.max(b, g), r)
+        _, changed = cv2.threshold(diff, self.threshold, 1, cv2.THRESH_BINARY)
+
+        # Rellenar hasta un múltiplo de tile para contar por teselas con un reshape
+        rows, cols = self.grid(frame.shape)
+        h, w = changed.shape
+        changed = cv2.copyMakeBorder(changed, 0, rows * self.tile - h, 0, cols * self.tile - w,
+                                     cv2.BORDER_CONSTANT, value=0)
+        counts = np.count_nonzero(changed.reshape(rows, self.tile, cols, self.tile), axis=(1, 3))
+        return counts >= self.min_pixels
+
+    def spans(self, dirty):
+        """Tramos (fila, columna inicial, columna final) de teselas sucias contiguas"""
+        result = []
+        for row in range(dirty.shape[0]):
+            cols = np.flatnonzero(dirty[row])
+            if cols.size == 0:
+                continue
+            start = prev = cols[0]
+            for col in cols[1:]:
+                if col != prev + 1:
+                    result.append((row, start, prev + 1))
+                    start = col
+                prev = col
+            result.append((row, start, prev + 1))
+        return result
+
+    def process(self, frame, func, halo, key=None):
+        """Aplica func solo a las teselas sucias y devuelve la salida completa
+
+        key identifica el filtro y sus parámetros: si cambia, se procesa el frame entero.
+        halo None indica que el filtro no se puede procesar por zonas.
+        """
+        start = time.perf_counter()
+        full = (halo is None or self.output is None or key != self.key or
+                self.reference.shape != frame.shape)
+
+        if full:
+            self.output = func(frame).copy()
+            self.reference = frame.copy()
+            self.key = key
+            fraction = 1.0
+        else:
+            dirty = self.dirty_tiles(frame)
+            if halo > 0:
+                # Las teselas vecinas también cambian si el cambio cae dentro del radio del filtro
+                reach = 2 * (-(-halo // self.tile)) + 1
+                dirty = cv2.dilate(dirty.astype(np.uint8), np.ones((reach, reach), np.uint8)).astype(bool)
+            h, w = frame.shape[:2]
+            for row, col0, col1 in self.spans(dirty):
+                y0, y1 = row * self.tile, min(h, (row + 1) * self.tile)
+                x0, x1 = col0 * self.tile, min(w, col1 * self.tile)
+                # Zona con margen, recortada al frame (en los bordes coincide con el del frame)
+                hy0, hy1 = max(0, y0 - halo), min(h, y1 + halo)
+                hx0, hx1 = max(0, x0 - halo), min(w, x1 + halo)
+                result = func(frame[hy0:hy1, hx0:hx1])
+                self.output[y0:y1, x0:x1] = result[y0 - hy0:y1 - hy0, x0 - hx0:x1 - hx0]
+                self.reference[y0:y1, x0:x1] = frame[y0:y1, x0:x1]
+            fraction = float(dirty.mean())
+
+        self.last_fraction = fraction
+        self.frames += 1
+        self.avg_fraction = fraction if self.frames == 1 else 0.9 * self.avg_fraction + 0.1 * fraction
+        self.last_ms = (time.perf_counter() - start) * 1000
+        return self.output
@@ -0,0 +1,119 @@
+import csv
+import json
+import time
+from collections import deque
+import cv2
+import numpy as np
+
+
+class FrameTimer:
+    """Tiempos por etapa de cada frame con percentiles móviles y traza exportable
+
+    Uso en el bucle:
+        timer.start_frame()
+        ... ; timer.lap('captura')
+        ... ; timer.lap('filtro')
+        timer.end_frame()
+    Cada lap() mide desde el lap anterior (o desde start_frame) con perf_counter.
+    La traza solo se guarda con keep_trace (para dump) y como mucho de los
+    últimos max_trace frames.
+    """
+
+    def __init__(self, stages, window=300, keep_trace=False, refresh=15, max_trace=100000):
+        self.stages = list(stages)
+        self.index = {name: i for i, name in enumerate(self.stages)}
+        self.window = window
+        self.keep_trace = keep_trace
+        self.refresh = refresh
+
+        # Ventana móvil en ms: filas = frames, columnas = etapas + total
+        self.samples = np.zeros((window, len(self.stages) + 1), dtype=np.float32)
+        self.current = np.zeros(len(self.stages) + 1, dtype=np.float32)
+        self.frames = 0
+        self.trace = deque(maxlen=max_trace)
+
+        self.frame_start = None
+        self.last_mark = None
+        self.summary_cache = None
+        self.summary_frame = -1
+
+    def start_frame(self):
+        self.current[:] = 0
+        self.frame_start = self.last_mark = time.perf_counter()
+
+    def lap(self, stage):
+        """Suma a stage el tiempo desde la última marca"""
+        now = time.perf_counter()
+        self.current[self.index[stage]] += (now - self.last_mark) * 1000
+        self.last_mark = now
+
+    def end_frame(self):
+        self.current[-1] = (time.perf_counter() - self.frame_start) * 1000
+        self.samples[self.frames % self.window] = self.current
+        if self.keep_trace:
+            self.trace.append((time.time(), *self.current.tolist()))
+        self.frames += 1
+
+    def summary(self):
+        """{etapa: (p50, p95, p99)} en ms sobre la ventana móvil, y 'total'
+
+        Se recalcula como mucho cada refresh frames para que el HUD no cueste.
+        """
+        if self.summary_cache is not None and self.frames - self.summary_frame < self.refresh:
+            return self.summary_cache
+
+        count = min(self.frames, self.window)
+        if count == 0:
+            return {}
+        p50, p95, p99 = np.percentile(self.samples[:count], [50, 95, 99], axis=0)
+        self.summary_cache = {
+            name: (float(p50[i]), float(p95[i]), float(p99[i]))
+            for i, name in enumerate(self.stages + ['total'])
+        }
+        self.summary_frame = self.frames
+        return self.summary_cache
+
+    @property
+    def fps(self):
+        """FPS a partir de la mediana del tiempo total del frame"""
+        summary = self.summary()
+        return 1000.0 / summary['total'][0] if summary and summary['total'][0] > 0 else 0.0
+
+    def draw_hud(self, frame, origin=(10, 140), color=(0, 255, 255)):
+        """Dibuja FPS y p50/p95/p99 de cada etapa sobre el frame"""
+        summary = self.summary()
+        if not summary:
+            return frame
+
+        x, y = origin
+        lines = [f"FPS: {self.fps:.1f}  (p50 / p95 / p99 ms)"]
+        lines += [f"{name:<8} {p50:6.1f} {p95:6.1f} {p99:6.1f}" for name, (p50, p95, p99) in summary.items()]
+
+        height = 16 * len(lines) + 8
+        cv2.rectangle(frame, (x - 5, y - 14), (x + 260, y - 14 + height), (0, 0, 0), -1)
+        for i, line in enumerate(lines):
+            cv2.putText(frame, line, (x, y + 16 * i), cv2.FONT_HERSHEY_SIMPLEX, 0.4, color, 1)
+        return frame
+
+    def report(self):
+        """Resumen en texto para imprimir al salir"""
+        self.summary_cache = None  # Forzar el cálculo con todos los frames
+        summary = self.summary()
+        lines = [f"⏱️  {self.frames} frames | {self.fps:.1f} FPS (mediana)"]
+        for name, (p50, p95, p99) in summary.items():
+            lines.append(f"   {name:<8} p50 {p50:6.2f} | p95 {p95:6.2f} | p99 {p99:6.2f} ms")
+        return "\n".join(lines)
+
+    def dump(self, path):
+        """Guarda la traza (últimos max_trace frames) en CSV o JSON según la extensión"""
+        columns = ['timestamp'] + [f"{name}_ms" for name in self.stages] + ['total_ms']
+        if path.lower().endswith('.json'):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'stages': self.stages, 'summary': self.summary(),
+                           'frames': [dict(zip(columns, row)) for row in self.trace]}, f, indent=1)
+        else:
+            with open(path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                writer.writerows(self.trace)
+        return path
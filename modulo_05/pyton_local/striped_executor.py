@@ -0,0 +1,49 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+
+class StripedExecutor:
+    """Aplica un filtro por franjas horizontales en un pool de hilos
+
+    OpenCV libera el GIL, así que las franjas se filtran de verdad en paralelo.
+    Cada franja se procesa con radius filas extra por arriba y por abajo (el
+    radio del filtro) y solo se copia su interior, así que el resultado es
+    idéntico byte a byte al de filtrar el frame entero. Los filtros que dependen
+    de toda la imagen (radius None) se aplican de una vez.
+    """
+
+    def __init__(self, workers=None, min_rows=32):
+        self.workers = max(1, workers if workers is not None else (os.cpu_count() or 1))
+        self.min_rows = min_rows
+        self.pool = ThreadPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+
+    def stripes(self, height, radius):
+        """[(y0, y1, y0 con margen, y1 con margen), ...] para repartir height filas"""
+        count = max(1, min(self.workers, height // self.min_rows))
+        bounds = np.linspace(0, height, count + 1).astype(int)
+        return [(y0, y1, max(0, y0 - radius), min(height, y1 + radius))
+                for y0, y1 in zip(bounds[:-1], bounds[1:])]
+
+    def run(self, frame, func, radius):
+        """func(frame) calculado por franjas; radius None o un solo hilo = sin repartir"""
+        if self.pool is None or radius is None:
+            return func(frame)
+
+        stripes = self.stripes(frame.shape[0], radius)
+        if len(stripes) == 1:
+            return func(frame)
+
+        futures = [self.pool.submit(func, frame[hy0:hy1]) for _, _, hy0, hy1 in stripes]
+        output = None
+        for (y0, y1, hy0, _), future in zip(stripes, futures):
+            result = future.result()
+            if output is None:
+                output = np.empty((frame.shape[0],) + result.shape[1:], dtype=result.dtype)
+            output[y0:y1] = result[y0 - hy0:y1 - hy0]
+        return output
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=True)
+            self.pool = None
@@ -8,24 +8,44 @@
 
 # --------------------------------------------------------------------------------
 
+import sys
 import cv2
-import numpy as np
+from frame_sources import source_from_argv
+from auto_canny import AutoCannyThresholds
 
-# Inicializa la webcam
-cap = cv2.VideoCapture(0)
+# Inicializa la fuente de vídeo: webcam 0 por defecto, o vídeo/carpeta/synthetic como argumento
+cap = source_from_argv(sys.argv)
+
+# Umbrales fijos o automáticos (tecla 'a'), calculados con la mediana del histograma del frame
+threshold1, threshold2 = 100, 200
+auto_thresholds = AutoCannyThresholds()
+auto_mode = False
+print("Presiona 'a' para umbrales automáticos y 'q' para salir")
 
 while True:
     ret,frame=cap.read()
-    if ret==True:
-        # Convertir a escala de grises
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        # Aplicar Canny
-        edges = cv2.Canny(gray, 100, 200)
-        # Mostrar imagen original y bordes
-        cv2.imshow('frame',frame)
-        cv2.imshow('Canny',edges)
-        if cv2.waitKey(1) & 0xFF==ord('q'):
-            break
+    if not ret:
+        break
+    # Convertir a escala de grises
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    # Aplicar Canny
+    if auto_mode:
+        threshold1, threshold2 = auto_thresholds.update(gray)
+    edges = cv2.Canny(gray, threshold1, threshold2)
+    # Mostrar imagen original y bordes
+    mode = "auto" if auto_mode else "fijos"
+    cv2.putText(frame, f"Umbrales ({mode}): {threshold1} / {threshold2}", (10, 25),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
+    cv2.imshow('frame',frame)
+    cv2.imshow('Canny',edges)
+    key = cv2.waitKey(1) & 0xFF
+    if key==ord('q'):
+        break
+    elif key==ord('a'):
+        auto_mode = not auto_mode
+        if not auto_mode:
+            threshold1, threshold2 = 100, 200
+        print(f"Umbrales {'automáticos' if auto_mode else 'fijos (100 / 200)'}")
 
 cap.release()
 cv2.destroyAllWindows()
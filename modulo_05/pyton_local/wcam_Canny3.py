@@ -1,12 +1,39 @@
+import argparse
+import time
 import cv2
 import numpy as np
+from frame_sources import open_source
+from filter_pool import MultiprocessFilterPipeline
+from async_recorder import AsyncVideoRecorder
+from capture_saver import CaptureSaver
+from image_adjust import ColorAdjuster
+from filters import FilterChain
+from frame_context import FrameContext
+from perf_trace import FrameTimer
+from adaptive_quality import AdaptiveQuality
+from canny_sweep import CannySweep
+from auto_canny import AutoCannyThresholds
+from incremental_filter import TileIncrementalFilter
+from striped_executor import StripedExecutor
 
 class WebcamFilterApp:
-    def __init__(self):
-        # Inicializar webcam
-        self.cap = cv2.VideoCapture(0)
-        if not self.cap.isOpened():
-            raise Exception("No se pudo abrir la webcam")
+    def __init__(self, source=None, headless=False, workers=0, trace_path=None,
+                 capture_format='jpg', capture_quality=None):
+        # En modo headless (procesado por lotes) no se abre la webcam ni ventanas
+        self.headless = headless
+        
+        # Procesos para filtrar en paralelo (0 = en el hilo principal)
+        self.workers = workers
+        self.pipeline = None
+        self.last_processed = None
+        
+        # Inicializar fuente de vídeo (webcam 0 si no se indica otra)
+        if headless and source is None:
+            self.cap = None
+        else:
+            self.cap = open_source(0 if source is None else source)
+            if not self.cap.isOpened():
+                raise Exception("No se pudo abrir la fuente de vídeo")
         
         # Variables de control
         self.current_filter = 0
@@ -16,6 +43,19 @@ class WebcamFilterApp:
             "Emboss", "Sharpen"
         ]
         
+        # Cada entrada del trackbar es una cadena del registro de filtros (filters.py)
+        self.filter_chains = [FilterChain([step]) for step in [
+            "Original", "Canny", "Blur", "Sepia", "Negative",
+            "Cartoon", "Colormap", "Neon", "Colormap", "HueColormap",
+            "Emboss", "Sharpen"
+        ]]
+        
+        # Cadena personalizada (p. ej. "Sharpen>Cartoon>Thermal"); si existe sustituye al trackbar
+        self.custom_chain = None
+        
+        # Gris/HSV/bordes del frame actual compartidos entre pasos de la cadena
+        self.frame_context = FrameContext()
+        
         # Parámetros ajustables
         self.brightness = 0
         self.contrast = 100
@@ -25,6 +65,9 @@ class WebcamFilterApp:
         self.edge_threshold2 = 200
         self.colormap_type = 2  # JET por defecto
         
+        # Brillo/contraste/saturación con LUT cacheadas
+        self.color_adjuster = ColorAdjuster()
+        
         # Lista de colormaps disponibles
         self.colormaps = [
             cv2.COLORMAP_AUTUMN, cv2.COLORMAP_BONE, cv2.COLORMAP_JET,
@@ -40,9 +83,43 @@ class WebcamFilterApp:
         
         # Estado de grabación
         self.recording = False
-        self.video_writer = None
+        self.video_writer = None  # AsyncVideoRecorder mientras se graba
+        self.record_policy = 'drop'
+        
+        # Capturas de pantalla en segundo plano (incluye ráfagas)
+        self.capture_saver = CaptureSaver(fmt=capture_format, quality=capture_quality)
+        self.burst_count = 10
+        self.burst_interval = 0.2
+        
+        # Tiempos por etapa (HUD con la tecla H y traza opcional al salir)
+        self.perf = FrameTimer(['captura', 'ajuste', 'filtro', 'overlay', 'imshow', 'waitkey'],
+                               keep_trace=bool(trace_path))
+        self.show_hud = False
+        self.trace_path = trace_path
+        
+        # Resolución interna adaptativa para los filtros caros (tecla A)
+        self.quality = AdaptiveQuality(target_fps=20)
+        
+        # Filtros caros repartidos por franjas en un pool de hilos (1 hilo = sin repartir)
+        self.striped = StripedExecutor()
+        
+        # Filtros caros solo sobre las teselas que cambian (tecla I)
+        self.incremental = TileIncrementalFilter(tile=64)
+        self.incremental_enabled = False
+        
+        # Umbrales de Canny automáticos según la iluminación (tecla T)
+        self.auto_canny = AutoCannyThresholds()
+        self.auto_canny_enabled = False
         
-        self.setup_ui()
+        # Barrido de umbrales de Canny (tecla E): None mientras está desactivado
+        self.canny_sweep = None
+        
+        # FPS reales del bucle (para grabar a la velocidad correcta)
+        self.measured_fps = 0.0
+        self.last_frame_time = None
+        
+        if not self.headless:
+            self.setup_ui()
     
     def setup_ui(self):
         """Configura la interfaz de usuario con trackbars"""
@@ -68,7 +145,7 @@ class WebcamFilterApp:
     
     def create_control_panel(self):
         """Crea un panel de control visual"""
-        control_img = np.zeros((200, 400, 3), dtype=np.uint8)
+        control_img = np.zeros((275, 400, 3), dtype=np.uint8)
         
         # Título
         cv2.putText(control_img, 'WEBCAM FILTERS PRO', (80, 30), 
@@ -79,17 +156,23 @@ class WebcamFilterApp:
             "CONTROLES:",
             "R - Iniciar/Parar grabacion",
             "S - Captura de pantalla", 
+            "B - Rafaga de capturas",
+            "H - HUD de rendimiento",
+            "A - Calidad adaptativa",
+            "E - Barrido de umbrales Canny (U - usar el estable)",
+            "T - Umbrales Canny automaticos",
+            "I - Recalcular solo las zonas que cambian",
             "ESPACIO - Siguiente filtro",
             "ESC - Salir",
             "",
-            f"Filtro actual: {self.filter_names[self.current_filter]}",
+            f"Filtro actual: {self.active_filter_name()}",
             f"ColorMap: {self.colormap_names[self.colormap_type]}"
         ]
         
         y_offset = 60
         for i, text in enumerate(instructions):
-            color = (0, 255, 0) if i < 5 else (255, 255, 255)
-            if i == 6:  # Filtro actual
+            color = (0, 255, 0) if i < 11 else (255, 255, 255)
+            if i == 12:  # Filtro actual
                 color = (0, 255, 255)
             cv2.putText(control_img, text, (10, y_offset + i*15), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.4, color, 1)
@@ -99,6 +182,7 @@ class WebcamFilterApp:
     # Callbacks para trackbars
     def on_filter_change(self, val):
         self.current_filter = val
+        self.custom_chain = None  # Elegir un filtro en el trackbar anula la cadena
         self.create_control_panel()
     
     def on_brightness_change(self, val):
@@ -125,82 +209,144 @@ class WebcamFilterApp:
         self.colormap_type = val
         self.create_control_panel()
     
+    def find_filter(self, name):
+        """Devuelve el índice de un filtro a partir de su nombre o número"""
+        if isinstance(name, int) or str(name).isdigit():
+            index = int(name)
+            if 0 <= index < len(self.filter_names):
+                return index
+        else:
+            lowered = [f.lower() for f in self.filter_names]
+            if str(name).lower() in lowered:
+                return lowered.index(str(name).lower())
+        raise ValueError(f"Filtro desconocido: {name} (opciones: {', '.join(self.filter_names)})")
+    
+    def find_colormap(self, name):
+        """Devuelve el índice de un colormap a partir de su nombre o número"""
+        if isinstance(name, int) or str(name).isdigit():
+            index = int(name)
+            if 0 <= index < len(self.colormap_names):
+                return index
+        else:
+            lowered = [c.lower() for c in self.colormap_names]
+            if str(name).lower() in lowered:
+                return lowered.index(str(name).lower())
+        raise ValueError(f"Colormap desconocido: {name} (opciones: {', '.join(self.colormap_names)})")
+    
+    def configure(self, filter_name=None, brightness=None, contrast=None, saturation=None,
+                  blur=None, canny_min=None, canny_max=None, colormap=None, chain=None):
+        """Fija los parámetros sin trackbars (mismos rangos que los controles)"""
+        if filter_name is not None:
+            self.current_filter = self.find_filter(filter_name)
+        if chain is not None:
+            self.custom_chain = FilterChain.parse(chain) if chain else None
+        if brightness is not None:
+            self.brightness = brightness
+        if contrast is not None:
+            self.contrast = contrast
+        if saturation is not None:
+            self.saturation = saturation
+        if blur is not None:
+            self.on_blur_change(blur)
+        if canny_min is not None:
+            self.edge_threshold1 = canny_min
+        if canny_max is not None:
+            self.edge_threshold2 = canny_max
+        if colormap is not None:
+            self.colormap_type = self.find_colormap(colormap)
+    
     def adjust_brightness_contrast(self, frame):
         """Ajusta brillo y contraste"""
-        alpha = self.contrast / 100.0  # Factor de contraste
-        beta = self.brightness  # Brillo
-        return cv2.convertScaleAbs(frame, alpha=alpha, beta=beta)
+        return self.color_adjuster.brightness_contrast(frame, self.brightness, self.contrast)
     
     def adjust_saturation(self, frame):
         """Ajusta saturación"""
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-        hsv[:, :, 1] = hsv[:, :, 1] * (self.saturation / 100.0)
-        hsv[:, :, 1] = np.clip(hsv[:, :, 1], 0, 255)
-        return cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
+        return self.color_adjuster.saturation(frame, self.saturation)
+    
+    def adjust_frame(self, frame):
+        """Brillo, contraste y saturación en una sola etapa (no hace nada si son neutros)"""
+        return self.color_adjuster.apply(frame, self.brightness, self.contrast, self.saturation)
+    
+    def active_chain(self):
+        """Cadena que se aplica ahora: la personalizada o la del filtro seleccionado"""
+        return self.custom_chain or self.filter_chains[self.current_filter]
+    
+    def active_filter_name(self):
+        return self.custom_chain.name if self.custom_chain else self.filter_names[self.current_filter]
+    
+    def chain_values(self):
+        """Valores de los controles que pueden usar los filtros de la cadena"""
+        return {
+            'blur': self.blur_intensity,
+            'canny_min': self.edge_threshold1,
+            'canny_max': self.edge_threshold2,
+            'colormap': self.colormaps[self.colormap_type],
+        }
     
     def apply_filter(self, frame):
-        """Aplica el filtro seleccionado"""
-        filter_idx = self.current_filter
-        
-        if filter_idx == 0:  # Original
-            return frame
-        
-        elif filter_idx == 1:  # Canny
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            edges = cv2.Canny(gray, self.edge_threshold1, self.edge_threshold2)
-            return cv2.cvtColor(edges, cv2.COLOR_GRAY2BGR)
-        
-        elif filter_idx == 2:  # Blur
-            return cv2.GaussianBlur(frame, (self.blur_intensity, self.blur_intensity), 0)
-        
-        elif filter_idx == 3:  # Sepia
-            sepia_kernel = np.array([[0.272, 0.534, 0.131],
-                                    [0.349, 0.686, 0.168],
-                                    [0.393, 0.769, 0.189]])
-            sepia = cv2.transform(frame, sepia_kernel)
-            return np.clip(sepia, 0, 255).astype(np.uint8)
-        
-        elif filter_idx == 4:  # Negativo
-            return 255 - frame
-        
-        elif filter_idx == 5:  # Cartoon
-            bilateral = cv2.bilateralFilter(frame, 15, 40, 40)
-            gray = cv2.cvtColor(bilateral, cv2.COLOR_BGR2GRAY)
-            gray_blur = cv2.medianBlur(gray, 7)
-            edges = cv2.adaptiveThreshold(gray_blur, 255, cv2.ADAPTIVE_THRESH_MEAN_C, 
-                                        cv2.THRESH_BINARY, 7, 7)
-            edges = cv2.cvtColor(edges, cv2.COLOR_GRAY2BGR)
-            return cv2.bitwise_and(bilateral, edges)
-        
-        elif filter_idx == 6:  # Vintage
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            return cv2.applyColorMap(gray, self.colormaps[self.colormap_type])
-        
-        elif filter_idx == 7:  # Neon
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            edges = cv2.Canny(gray, 50, 150)
-            return cv2.applyColorMap(edges, cv2.COLORMAP_HOT)
-        
-        elif filter_idx == 8:  # Thermal
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            return cv2.applyColorMap(gray, self.colormaps[self.colormap_type])
-        
-        elif filter_idx == 9:  # HSV
-            hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-            return cv2.applyColorMap(hsv[:,:,0], self.colormaps[self.colormap_type])
-        
-        elif filter_idx == 10:  # Emboss
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            kernel = np.array([[-2, -1, 0], [-1, 1, 1], [0, 1, 2]], dtype=np.float32)
-            emboss = cv2.filter2D(gray, -1, kernel) + 128
-            emboss = np.clip(emboss, 0, 255).astype(np.uint8)
-            return cv2.applyColorMap(emboss, cv2.COLORMAP_BONE)
-        
-        elif filter_idx == 11:  # Sharpen
-            kernel = np.array([[-1,-1,-1], [-1,9,-1], [-1,-1,-1]])
-            return cv2.filter2D(frame, -1, kernel)
-        
-        return frame
+        """Aplica el filtro seleccionado (los caros, por franjas en varios hilos)"""
+        chain = self.active_chain()
+        if chain.cost == 'expensive' and self.striped.workers > 1:
+            values = self.chain_values()
+            return self.striped.run(frame, lambda stripe: chain.apply(stripe, values), chain.radius)
+        return chain.apply(frame, self.chain_values(), self.frame_context)
+    
+    def uses_incremental(self):
+        chain = self.active_chain()
+        return self.incremental_enabled and chain.cost == 'expensive' and chain.radius is not None
+    
+    def apply_filter_incremental(self, frame):
+        """Filtro caro solo sobre las teselas que han cambiado desde el frame anterior"""
+        chain = self.active_chain()
+        values = self.chain_values()
+        # Solo los parámetros que usa cada paso: cambiar otros (p. ej. Canny automático) no invalida la salida
+        key = (chain.name, tuple(tuple(sorted(spec.resolve(values, overrides).items()))
+                                 for spec, overrides in chain.steps))
+        return self.incremental.process(frame, lambda region: chain.apply(region, values), chain.radius, key)
+    
+    def apply_filter_adaptive(self, frame):
+        """Filtros caros a resolución reducida si no llegan a los FPS objetivo, o por teselas"""
+        if self.uses_incremental():
+            return self.apply_filter_incremental(frame)
+        if self.active_chain().cost == 'expensive':
+            return self.quality.process(frame, self.apply_filter)
+        return self.apply_filter(frame)
+    
+    def process_frame(self, frame):
+        """Cadena completa: brillo/contraste -> saturación -> filtro"""
+        return self.apply_filter(self.adjust_frame(frame))
+    
+    def filter_params(self):
+        """Parámetros actuales en el formato de configure() (para los procesos)"""
+        return {
+            'filter_name': self.current_filter, 'brightness': self.brightness,
+            'contrast': self.contrast, 'saturation': self.saturation,
+            'blur': self.blur_intensity, 'canny_min': self.edge_threshold1,
+            'canny_max': self.edge_threshold2, 'colormap': self.colormap_type,
+            'chain': self.custom_chain.name if self.custom_chain else ''
+        }
+    
+    def process_frame_parallel(self, frame):
+        """Envía el frame al pipeline multiproceso y devuelve el último resultado en orden"""
+        if self.pipeline is None or self.pipeline.shape != frame.shape:
+            self.close_pipeline()
+            self.pipeline = MultiprocessFilterPipeline(frame.shape, workers=self.workers).start()
+        
+        # Si todos los huecos están ocupados se descarta el frame en vez de bloquear la captura
+        self.pipeline.try_submit(frame, self.filter_params())
+        # Los ajustes se hacen en los procesos: aquí 'ajuste' es la copia a memoria compartida y el envío
+        self.perf.lap('ajuste')
+        
+        result = self.pipeline.poll()
+        if result is not None:
+            self.last_processed = result[1].copy()
+        return self.last_processed if self.last_processed is not None else frame
+    
+    def close_pipeline(self):
+        """Detiene los procesos del pipeline si están activos"""
+        if self.pipeline is not None:
+            self.pipeline.close()
+            self.pipeline = None
     
     def add_ui_overlay(self, frame):
         """Añade información de overlay"""
@@ -208,11 +354,11 @@ class WebcamFilterApp:
         
         # Fondo semi-transparente para el texto
         overlay = frame.copy()
-        cv2.rectangle(overlay, (10, 10), (400, 120), (0, 0, 0), -1)
+        cv2.rectangle(overlay, (10, 10), (400, 135), (0, 0, 0), -1)
         frame = cv2.addWeighted(frame, 0.8, overlay, 0.2, 0)
         
         # Información del filtro
-        cv2.putText(frame, f"Filtro: {self.filter_names[self.current_filter]}", 
+        cv2.putText(frame, f"Filtro: {self.active_filter_name()}", 
                    (20, 35), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
         cv2.putText(frame, f"ColorMap: {self.colormap_names[self.colormap_type]}", 
                    (20, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
@@ -220,98 +366,242 @@ class WebcamFilterApp:
         # Parámetros actuales
         cv2.putText(frame, f"Brillo: {self.brightness} | Contraste: {self.contrast}%", 
                    (20, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
-        cv2.putText(frame, f"Saturacion: {self.saturation}% | Blur: {self.blur_intensity}", 
+        canny_mode = " auto" if self.auto_canny_enabled else ""
+        cv2.putText(frame, f"Saturacion: {self.saturation}% | Blur: {self.blur_intensity} | "
+                   f"Canny: {self.edge_threshold1}/{self.edge_threshold2}{canny_mode}", 
                    (20, 100), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
         
+        # Escala interna del filtro (calidad adaptativa) o teselas recalculadas (modo incremental)
+        if self.uses_incremental():
+            cv2.putText(frame, f"Incremental: {self.incremental.last_fraction * 100:.0f}% de teselas recalculadas", 
+                       (20, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 0), 1)
+        else:
+            scale = self.quality.scale if self.active_chain().cost == 'expensive' else 1.0
+            quality_color = (255, 255, 255) if scale >= 1.0 else (0, 165, 255)
+            quality_mode = "auto" if self.quality.enabled else "fija"
+            cv2.putText(frame, f"Escala interna: {scale * 100:.0f}% ({quality_mode}, objetivo {self.quality.target_fps:.0f} FPS)", 
+                       (20, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.4, quality_color, 1)
+        
         # Estado de grabación
         if self.recording:
             cv2.circle(frame, (w-30, 30), 10, (0, 0, 255), -1)
             cv2.putText(frame, "REC", (w-60, 38), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 2)
+            if self.video_writer:
+                cv2.putText(frame, f"Cola: {self.video_writer.depth} | Perdidos: {self.video_writer.dropped}", 
+                           (w-170, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 0, 255), 1)
+        
+        # Tiempos por etapa
+        if self.show_hud:
+            self.perf.draw_hud(frame, (20, 160))
         
         return frame
     
+    def show_canny_sweep(self, frame):
+        """Evalúa todos los pares de umbrales sobre el frame y muestra la retícula"""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        self.canny_sweep.evaluate(gray)
+        cv2.imshow('Barrido Canny', self.canny_sweep.contact_sheet())
+    
+    def toggle_canny_sweep(self):
+        if self.canny_sweep is None:
+            self.canny_sweep = CannySweep()
+            print(f"🔬 Barrido Canny: {len(self.canny_sweep.pairs)} pares con un solo Sobel por frame")
+        else:
+            cv2.destroyWindow('Barrido Canny')
+            self.canny_sweep = None
+    
+    def toggle_auto_canny(self):
+        """Activa los umbrales automáticos; al desactivarlos vuelven los de los trackbars"""
+        self.auto_canny_enabled = not self.auto_canny_enabled
+        if not self.auto_canny_enabled and not self.headless:
+            self.edge_threshold1 = cv2.getTrackbarPos('Canny Min', 'Controls')
+            self.edge_threshold2 = cv2.getTrackbarPos('Canny Max', 'Controls')
+        print(f"🌗 Umbrales Canny automáticos: {'ON' if self.auto_canny_enabled else 'OFF'}")
+    
+    def use_stable_canny_pair(self):
+        """Lleva el par de umbrales más estable del barrido a los trackbars"""
+        pair = self.canny_sweep.stable_pair() if self.canny_sweep is not None else None
+        if pair is None:
+            print("⚠️  Activa el barrido (E) y espera unos frames para tener un par estable")
+            return
+        self.edge_threshold1, self.edge_threshold2 = pair
+        cv2.setTrackbarPos('Canny Min', 'Controls', pair[0])
+        cv2.setTrackbarPos('Canny Max', 'Controls', pair[1])
+        print(f"✂️  Umbrales Canny: {pair[0]} / {pair[1]}")
+    
+    def update_measured_fps(self):
+        """Media móvil de los FPS reales del bucle de captura"""
+        now = time.perf_counter()
+        if self.last_frame_time is not None:
+            elapsed = now - self.last_frame_time
+            if elapsed > 0:
+                current = 1.0 / elapsed
+                self.measured_fps = current if self.measured_fps == 0 else 0.9 * self.measured_fps + 0.1 * current
+        self.last_frame_time = now
+    
     def start_recording(self, frame_width, frame_height):
-        """Inicia la grabación de video"""
-        fourcc = cv2.VideoWriter_fourcc(*'XVID')
-        self.video_writer = cv2.VideoWriter('webcam_output.avi', fourcc, 20.0, 
-                                          (frame_width, frame_height))
+        """Inicia la grabación de video en segundo plano"""
+        # Se graba al ritmo medido para que el vídeo no salga acelerado ni ralentizado
+        fps = round(self.measured_fps, 1) if self.measured_fps > 1 else 20.0
+        self.video_writer = AsyncVideoRecorder('webcam_output.avi', (frame_width, frame_height), fps=fps,
+                                               fourcc='XVID', max_queue=64, policy=self.record_policy)
         self.recording = True
-        print("📹 Grabación iniciada - webcam_output.avi")
+        print(f"📹 Grabación iniciada - webcam_output.avi ({fps} fps, política '{self.record_policy}')")
     
     def stop_recording(self):
-        """Detiene la grabación"""
+        """Detiene la grabación (espera a que se codifiquen los frames pendientes)"""
         if self.video_writer:
-            self.video_writer.release()
+            written, dropped = self.video_writer.stop()
+            print(f"💾 Frames grabados: {written} | descartados: {dropped} | cola máxima: {self.video_writer.max_depth}")
             self.video_writer = None
         self.recording = False
         print("⏹️ Grabación detenida")
     
     def save_screenshot(self, frame):
-        """Guarda una captura de pantalla"""
-        filename = f"screenshot_{cv2.getTickCount()}.jpg"
-        cv2.imwrite(filename, frame)
-        print(f"📸 Captura guardada: {filename}")
+        """Guarda una captura de pantalla (la codificación se hace en segundo plano)"""
+        filename = self.capture_saver.save(frame, prefix='screenshot', copy=False)
+        if filename:
+            print(f"📸 Captura en cola: {filename}")
+        else:
+            print("⚠️  Demasiadas capturas pendientes, captura descartada")
+    
+    def start_burst(self):
+        """Inicia una ráfaga de capturas sin detener el vídeo"""
+        self.capture_saver.start_burst(self.burst_count, self.burst_interval, prefix='burst')
+        print(f"📸 Ráfaga: {self.burst_count} capturas cada {self.burst_interval} s")
     
     def run(self):
         """Ejecuta la aplicación principal"""
         print("🎥 WEBCAM FILTERS PRO - Iniciado")
         print("=" * 40)
         
-        frame_count = 0
-        
-        while True:
-            ret, frame = self.cap.read()
-            if not ret:
-                break
+        try:
+            while True:
+                self.perf.start_frame()
+                ret, frame = self.cap.read()
+                if not ret:
+                    break
+                self.perf.lap('captura')
             
-            frame_count += 1
+                self.update_measured_fps()
             
-            # Aplicar ajustes básicos
-            frame = self.adjust_brightness_contrast(frame)
-            frame = self.adjust_saturation(frame)
+                # Aplicar ajustes básicos y filtro seleccionado
+                adjusted_frame = frame
+                if self.workers > 0:
+                    processed_frame = self.process_frame_parallel(frame)
+                else:
+                    adjusted_frame = self.adjust_frame(frame)
+                    if self.auto_canny_enabled:
+                        self.edge_threshold1, self.edge_threshold2 = self.auto_canny.update(adjusted_frame)
+                    self.perf.lap('ajuste')
+                    processed_frame = self.apply_filter_adaptive(adjusted_frame)
+                self.perf.lap('filtro')
             
-            # Aplicar filtro seleccionado
-            processed_frame = self.apply_filter(frame)
+                if self.canny_sweep is not None:
+                    self.show_canny_sweep(adjusted_frame)
             
-            # Añadir overlay de información
-            final_frame = self.add_ui_overlay(processed_frame)
+                # Añadir overlay de información
+                final_frame = self.add_ui_overlay(processed_frame)
             
-            # Grabar si está activo
-            if self.recording and self.video_writer:
-                self.video_writer.write(final_frame)
+                # Grabar si está activo
+                if self.recording and self.video_writer:
+                    self.video_writer.write(final_frame, copy=False)
+                self.perf.lap('overlay')
             
-            # Mostrar frame
-            cv2.imshow('Webcam Filters Pro', final_frame)
+                # Mostrar frame
+                cv2.imshow('Webcam Filters Pro', final_frame)
             
-            # Manejar teclas
-            key = cv2.waitKey(1) & 0xFF
+                # Siguiente foto de la ráfaga (si hay una en curso)
+                self.capture_saver.update(final_frame)
+                self.perf.lap('imshow')
             
-            if key == 27:  # ESC
-                break
-            elif key == ord(' '):  # Espacio - siguiente filtro
-                self.current_filter = (self.current_filter + 1) % len(self.filter_names)
-                cv2.setTrackbarPos('Filtro', 'Controls', self.current_filter)
-            elif key == ord('r') or key == ord('R'):  # Grabación
-                if not self.recording:
-                    h, w = final_frame.shape[:2]
-                    self.start_recording(w, h)
-                else:
-                    self.stop_recording()
-            elif key == ord('s') or key == ord('S'):  # Screenshot
-                self.save_screenshot(final_frame)
-        
-        # Limpiar
-        if self.recording:
-            self.stop_recording()
-        
-        self.cap.release()
-        cv2.destroyAllWindows()
-        print("👋 Aplicación cerrada")
+                # Manejar teclas
+                key = cv2.waitKey(1) & 0xFF
+                self.perf.lap('waitkey')
+                self.perf.end_frame()
+            
+                if key == 27:  # ESC
+                    break
+                elif key == ord(' '):  # Espacio - siguiente filtro
+                    self.current_filter = (self.current_filter + 1) % len(self.filter_names)
+                    self.custom_chain = None
+                    cv2.setTrackbarPos('Filtro', 'Controls', self.current_filter)
+                elif key == ord('r') or key == ord('R'):  # Grabación
+                    if not self.recording:
+                        h, w = final_frame.shape[:2]
+                        self.start_recording(w, h)
+                    else:
+                        self.stop_recording()
+                elif key == ord('s') or key == ord('S'):  # Screenshot
+                    self.save_screenshot(final_frame)
+                elif key == ord('b') or key == ord('B'):  # Ráfaga
+                    self.start_burst()
+                elif key == ord('h') or key == ord('H'):  # HUD de rendimiento
+                    self.show_hud = not self.show_hud
+                elif key == ord('a') or key == ord('A'):  # Calidad adaptativa
+                    self.quality.enabled = not self.quality.enabled
+                    if not self.quality.enabled:
+                        self.quality.reset()
+                    print(f"🎚️  Calidad adaptativa: {'ON' if self.quality.enabled else 'OFF'}")
+                elif key == ord('i') or key == ord('I'):  # Procesado incremental por teselas
+                    self.incremental_enabled = not self.incremental_enabled
+                    self.incremental.reset()
+                    print(f"🧩 Procesado incremental: {'ON' if self.incremental_enabled else 'OFF'}")
+                elif key == ord('t') or key == ord('T'):  # Umbrales Canny automáticos
+                    self.toggle_auto_canny()
+                elif key == ord('e') or key == ord('E'):  # Barrido de umbrales Canny
+                    self.toggle_canny_sweep()
+                elif key == ord('u') or key == ord('U'):  # Usar el par estable del barrido
+                    self.use_stable_canny_pair()
+        finally:
+            # Limpiar (también si el filtro o un proceso trabajador fallan)
+            if self.recording:
+                self.stop_recording()
+        
+            self.close_pipeline()
+            self.striped.close()
+            saved, dropped = self.capture_saver.close()
+            if saved or dropped:
+                print(f"📸 Capturas guardadas: {saved} | descartadas: {dropped}")
+            if self.incremental.frames:
+                print(f"🧩 Incremental: {self.incremental.avg_fraction * 100:.0f}% de teselas recalculadas (media)")
+            stats = self.frame_context.stats()
+            print(f"🧠 Intermedios (gris/HSV/bordes): {stats['hits']} reutilizados | {stats['misses']} calculados")
+            print(self.perf.report())
+            if self.trace_path:
+                print(f"📄 Traza de tiempos: {self.perf.dump(self.trace_path)}")
+            self.cap.release()
+            cv2.destroyAllWindows()
+            print("👋 Aplicación cerrada")
 
 # Ejecutar la aplicación
 if __name__ == "__main__":
     try:
-        app = WebcamFilterApp()
+        parser = argparse.ArgumentParser(description="Webcam Filters Pro")
+        parser.add_argument('source', nargs='?', default=None, help="Webcam, vídeo, carpeta o synthetic")
+        parser.add_argument('--workers', type=int, default=0, help="Procesos para filtrar en paralelo")
+        parser.add_argument('--politica-grabacion', choices=AsyncVideoRecorder.POLICIES, default='drop',
+                            help="Si la cola de grabación se llena: descartar frames o esperar")
+        parser.add_argument('--formato-captura', choices=list(CaptureSaver.FORMATS), default='jpg')
+        parser.add_argument('--calidad', type=int, default=None, help="Calidad JPEG/WebP o compresión PNG")
+        parser.add_argument('--cadena', default=None, help='Cadena de filtros, p. ej. "Sharpen>Cartoon>Thermal"')
+        parser.add_argument('--traza', default=None, help="Guardar los tiempos por frame al salir (.csv o .json)")
+        parser.add_argument('--fps-objetivo', type=float, default=20,
+                            help="Los filtros caros bajan su resolución interna si no llegan a estos FPS")
+        parser.add_argument('--sin-adaptativa', action='store_true', help="Procesar siempre a resolución completa")
+        parser.add_argument('--hilos-filtro', type=int, default=None,
+                            help="Hilos para repartir los filtros caros por franjas (por defecto, uno por núcleo)")
+        args = parser.parse_args()
+        
+        app = WebcamFilterApp(args.source, workers=args.workers, trace_path=args.traza,
+                              capture_format=args.formato_captura, capture_quality=args.calidad)
+        app.configure(chain=args.cadena)
+        app.quality.set_target_fps(args.fps_objetivo)
+        app.quality.enabled = not args.sin_adaptativa
+        if args.hilos_filtro is not None:
+            app.striped.close()
+            app.striped = StripedExecutor(args.hilos_filtro)
+        app.record_policy = args.politica_grabacion
         app.run()
     except Exception as e:
         print(f"❌ Error: {e}")
@@ -1,13 +1,19 @@
+import sys
 import cv2
 import numpy as np
 import math
+import time
+from colormap_lut import ColormapRegistry, BatchColormapRenderer, grid_cell_views
+from frame_sources import open_source
+from image_adjust import ColorAdjuster
+from frame_context import FrameContext
 
 class ColormapGridViewer:
-    def __init__(self):
-        # Inicializar webcam
-        self.cap = cv2.VideoCapture(0)
+    def __init__(self, source=None):
+        # Inicializar fuente de vídeo (webcam 0 si no se indica otra)
+        self.cap = open_source(0 if source is None else source)
         if not self.cap.isOpened():
-            raise Exception("No se pudo abrir la webcam")
+            raise Exception("No se pudo abrir la fuente de vídeo")
         
         # Todos los colormaps disponibles en OpenCV
         self.colormaps = [
@@ -54,32 +60,50 @@ class ColormapGridViewer:
         self.show_original = True
         self.brightness = 0
         self.contrast = 100
+        self.color_adjuster = ColorAdjuster()  # Brillo/contraste (nada si son neutros)
+        self.frame_context = FrameContext()    # Gris de la miniatura, compartido por todas las celdas
         self.selected_colormap = -1  # -1 significa ninguno seleccionado
         
+        # LUT precalculadas y motor por lotes (un solo gris para toda la retícula)
+        self.colormap_registry = ColormapRegistry()
+        self.colormap_infos = [('opencv', colormap, name) for colormap, name in self.colormaps]
+        self.batch_renderer = BatchColormapRenderer(self.colormap_registry, fill_value=30)
+        self.use_batch_render = True
+        self.render_ms = {'lotes': 0.0, 'celda': 0.0}
+        
+        # Caché de la parte estática de la retícula (fondo, cabecera, bordes y nombres)
+        self.chrome_canvas = None
+        self.chrome_key = None
+        self.chrome_hits = 0
+        self.chrome_misses = 0
+        
         print(f"Mostrando {len(self.colormaps)} colormaps en retícula {self.grid_rows}x{self.grid_cols}")
         print("Controles:")
         print("- ESPACIO: Mostrar/ocultar original")
         print("- +/-: Ajustar brillo")
         print("- Ctrl +/-: Ajustar contraste")
         print("- Click en celda: Seleccionar colormap")
+        print("- B: Render por lotes / por celda (comparar tiempos)")
         print("- ESC: Salir")
     
     def adjust_image(self, frame):
         """Ajusta brillo y contraste de la imagen"""
-        alpha = self.contrast / 100.0  # Factor de contraste
-        beta = self.brightness  # Brillo
-        return cv2.convertScaleAbs(frame, alpha=alpha, beta=beta)
+        return self.color_adjuster.brightness_contrast(frame, self.brightness, self.contrast)
     
-    def apply_colormap_to_frame(self, frame, colormap):
+    def apply_colormap_to_frame(self, frame, colormap, context=None):
         """Aplica un colormap específico al frame"""
-        # Convertir a escala de grises primero
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        # Convertir a escala de grises primero (una sola vez por frame si hay contexto)
+        gray = context.gray() if context is not None else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         # Aplicar el colormap
         colored = cv2.applyColorMap(gray, colormap)
         return colored
     
-    def create_grid_display(self, original_frame):
-        """Crea la visualización en retícula con todos los colormaps"""
+    def get_chrome_key(self):
+        """Estado del que depende la parte estática de la retícula"""
+        return (self.selected_colormap, self.brightness, self.contrast, self.show_original)
+    
+    def draw_grid_chrome(self):
+        """Dibuja fondo, cabecera, bordes y nombres (solo cuando cambia el estado)"""
         # Crear imagen base para la retícula
         grid_image = np.zeros((self.window_height, self.window_width, 3), dtype=np.uint8)
         
@@ -95,10 +119,7 @@ class ColormapGridViewer:
         cv2.putText(grid_image, info_text, 
                    (20, 55), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
         
-        # Redimensionar frame original para las celdas
-        resized_frame = cv2.resize(original_frame, (self.cell_width - 20, self.cell_height - 30))
-        
-        # Crear cada celda de la retícula
+        # Bordes y nombres de cada celda
         for i, (colormap, name) in enumerate(self.colormaps):
             # Calcular posición en la retícula
             row = i // self.grid_cols
@@ -108,9 +129,6 @@ class ColormapGridViewer:
             x = col * self.cell_width + (col + 1) * self.padding
             y = row * self.cell_height + (row + 1) * self.padding + 60  # +60 para el header
             
-            # Aplicar colormap al frame
-            colormap_frame = self.apply_colormap_to_frame(resized_frame, colormap)
-            
             # Crear borde de la celda
             border_color = (0, 255, 255) if i == self.selected_colormap else (100, 100, 100)
             border_thickness = 3 if i == self.selected_colormap else 1
@@ -119,21 +137,74 @@ class ColormapGridViewer:
                          (x + self.cell_width + 2, y + self.cell_height + 2), 
                          border_color, border_thickness)
             
-            # Insertar imagen con colormap
-            grid_image[y+5:y+5+colormap_frame.shape[0], 
-                      x+10:x+10+colormap_frame.shape[1]] = colormap_frame
-            
             # Añadir nombre del colormap
             cv2.putText(grid_image, name, (x + 10, y + self.cell_height - 8), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
-            
-            # Mostrar original en la primera celda si está activado
-            if i == 0 and self.show_original:
-                # Superponer frame original en esquina superior izquierda
-                original_small = cv2.resize(resized_frame, (80, 60))
-                grid_image[y+5:y+65, x+10:x+90] = original_small
-                cv2.putText(grid_image, "ORIG", (x + 95, y + 40), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.3, (0, 255, 0), 1)
+        
+        return grid_image
+    
+    def draw_dynamic_header(self, grid_image, render_mode):
+        """Redibuja solo la zona de la cabecera que cambia en cada frame"""
+        x = self.window_width - 260
+        cv2.rectangle(grid_image, (x, 10), (self.window_width - 1, 62), (30, 30, 30), -1)
+        cv2.putText(grid_image, f"Render ({render_mode}): {self.render_ms[render_mode]:.1f} ms", 
+                   (x, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (200, 200, 200), 1)
+        total = self.chrome_hits + self.chrome_misses
+        cv2.putText(grid_image, f"Chrome reutilizado: {self.chrome_hits}/{total}", 
+                   (x, 55), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (150, 150, 150), 1)
+    
+    def create_grid_display(self, original_frame):
+        """Crea la visualización en retícula con todos los colormaps"""
+        # Reutilizar el lienzo con la parte estática si el estado no ha cambiado
+        chrome_key = self.get_chrome_key()
+        if self.chrome_canvas is not None and chrome_key == self.chrome_key:
+            grid_image = self.chrome_canvas
+            self.chrome_hits += 1
+        else:
+            grid_image = self.draw_grid_chrome()
+            self.chrome_canvas = grid_image
+            self.chrome_key = chrome_key
+            self.chrome_misses += 1
+        
+        # Redimensionar frame original para las celdas
+        resized_frame = cv2.resize(original_frame, (self.cell_width - 20, self.cell_height - 30))
+        
+        self.frame_context.new_frame(resized_frame)
+        
+        # Sobrescribir únicamente las miniaturas
+        render_mode = 'lotes' if self.use_batch_render else 'celda'
+        render_start = time.perf_counter()
+        if self.use_batch_render:
+            cells = grid_cell_views(grid_image, (60 + self.padding + 5, self.padding + 10),
+                                    (self.cell_height + self.padding, self.cell_width + self.padding),
+                                    resized_frame.shape[:2], self.grid_rows, self.grid_cols)
+            self.batch_renderer.render(self.frame_context.gray(), cells, self.colormap_infos)
+        else:
+            for i, (colormap, name) in enumerate(self.colormaps):
+                row = i // self.grid_cols
+                col = i % self.grid_cols
+                x = col * self.cell_width + (col + 1) * self.padding
+                y = row * self.cell_height + (row + 1) * self.padding + 60
+                
+                colormap_frame = self.apply_colormap_to_frame(resized_frame, colormap, self.frame_context)
+                grid_image[y+5:y+5+colormap_frame.shape[0], 
+                          x+10:x+10+colormap_frame.shape[1]] = colormap_frame
+        
+        # Mostrar original en la primera celda si está activado
+        if self.show_original:
+            x = self.padding
+            y = self.padding + 60
+            original_small = cv2.resize(resized_frame, (80, 60))
+            grid_image[y+5:y+65, x+10:x+90] = original_small
+            cv2.putText(grid_image, "ORIG", (x + 95, y + 40), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.3, (0, 255, 0), 1)
+        
+        # Media móvil del tiempo de render de miniaturas
+        elapsed_ms = (time.perf_counter() - render_start) * 1000
+        previous = self.render_ms[render_mode]
+        self.render_ms[render_mode] = elapsed_ms if previous == 0 else 0.9 * previous + 0.1 * elapsed_ms
+        
+        self.draw_dynamic_header(grid_image, render_mode)
         
         return grid_image
     
@@ -220,6 +291,10 @@ class ColormapGridViewer:
             elif key == ord('v'):  # Disminuir contraste (con 'v')
                 self.contrast = max(50, self.contrast - 10)
                 print(f"Contraste: {self.contrast}%")
+            elif key == ord('b') or key == ord('B'):  # Lotes / por celda
+                self.use_batch_render = not self.use_batch_render
+                mode = "POR LOTES" if self.use_batch_render else "POR CELDA"
+                print(f"Render {mode} | lotes: {self.render_ms['lotes']:.2f} ms | celda: {self.render_ms['celda']:.2f} ms")
             elif key == ord('r'):  # Reset valores
                 self.brightness = 0
                 self.contrast = 100
@@ -227,6 +302,12 @@ class ColormapGridViewer:
                 print("Valores reseteados")
         
         # Limpiar
+        print(f"⏱️  Render medio de miniaturas: lotes {self.render_ms['lotes']:.2f} ms "
+              f"({self.batch_renderer.method}) | por celda {self.render_ms['celda']:.2f} ms")
+        print(f"🧩 Chrome de la retícula reutilizado en {self.chrome_hits} de "
+              f"{self.chrome_hits + self.chrome_misses} frames")
+        stats = self.frame_context.stats()
+        print(f"🧠 Conversiones a gris ahorradas: {stats['hits']} de {stats['hits'] + stats['misses']}")
         self.cap.release()
         cv2.destroyAllWindows()
         print("👋 Colormap Grid Viewer cerrado")
@@ -234,7 +315,7 @@ class ColormapGridViewer:
 # Ejecutar la aplicación
 if __name__ == "__main__":
     try:
-        app = ColormapGridViewer()
+        app = ColormapGridViewer(sys.argv[1] if len(sys.argv) > 1 else None)
         app.run()
     except Exception as e:
         print(f"❌ Error: {e}")
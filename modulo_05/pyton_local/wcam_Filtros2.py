@@ -1,73 +1,97 @@
+import argparse
 import cv2
 import numpy as np
 import math
-import matplotlib.pyplot as plt
-import matplotlib.cm as cm
 import time
-import threading
+from colormap_lut import ColormapRegistry, BatchColormapRenderer, grid_cell_views
+from frame_capture import LatestFrameCapture
+from frame_sources import open_source, WebcamSource
+from capture_saver import CaptureSaver
+from image_adjust import ColorAdjuster
+from frame_context import FrameContext
+from perf_trace import FrameTimer
+from frame_pacer import FramePacer
+
+# Colormaps de OpenCV
+OPENCV_COLORMAPS = [
+    (cv2.COLORMAP_AUTUMN, "CV_AUTUMN"),
+    (cv2.COLORMAP_BONE, "CV_BONE"),
+    (cv2.COLORMAP_JET, "CV_JET"),
+    (cv2.COLORMAP_WINTER, "CV_WINTER"),
+    (cv2.COLORMAP_RAINBOW, "CV_RAINBOW"),
+    (cv2.COLORMAP_OCEAN, "CV_OCEAN"),
+    (cv2.COLORMAP_SUMMER, "CV_SUMMER"),
+    (cv2.COLORMAP_SPRING, "CV_SPRING"),
+    (cv2.COLORMAP_COOL, "CV_COOL"),
+    (cv2.COLORMAP_HSV, "CV_HSV"),
+    (cv2.COLORMAP_PINK, "CV_PINK"),
+    (cv2.COLORMAP_HOT, "CV_HOT"),
+    (cv2.COLORMAP_PARULA, "CV_PARULA"),
+    (cv2.COLORMAP_MAGMA, "CV_MAGMA"),
+    (cv2.COLORMAP_INFERNO, "CV_INFERNO"),
+    (cv2.COLORMAP_PLASMA, "CV_PLASMA"),
+    (cv2.COLORMAP_VIRIDIS, "CV_VIRIDIS"),
+    (cv2.COLORMAP_CIVIDIS, "CV_CIVIDIS"),
+    (cv2.COLORMAP_TWILIGHT, "CV_TWILIGHT"),
+    (cv2.COLORMAP_TURBO, "CV_TURBO")
+]
+
+# Colormaps de matplotlib
+MATPLOTLIB_COLORMAPS = [
+    'flag', 'prism', 'ocean', 'gist_earth', 'terrain',
+    'gist_stern', 'gnuplot', 'gnuplot2', 'CMRmap',
+    'cubehelix', 'brg', 'gist_rainbow', 'rainbow', 'jet',
+    'turbo', 'nipy_spectral', 'gist_ncar', 'tab10', 'tab20',
+    'Set1', 'Set2', 'Set3', 'Pastel1', 'Pastel2', 'Paired',
+    'Accent', 'Dark2', 'seismic', 'coolwarm', 'bwr',
+    'copper', 'gray', 'bone', 'pink', 'spring', 'summer',
+    'autumn', 'winter', 'cool', 'hot', 'afmhot', 'gist_heat'
+]
+
 
 class RobustColormapGridViewer:
-    def __init__(self):
+    def __init__(self, source=None, trace_path=None):
         # Variables de control de webcam
         self.cap = None
-        self.frame_available = False
-        self.current_frame = None
-        self.frame_lock = threading.Lock()
+        self.capture = None
+        self.frame_sequence = 0
         self.running = True
         
         # Intentar inicializar webcam con diferentes backends
-        self.initialize_webcam()
-        
-        # Colormaps de OpenCV
-        self.opencv_colormaps = [
-            (cv2.COLORMAP_AUTUMN, "CV_AUTUMN"),
-            (cv2.COLORMAP_BONE, "CV_BONE"),
-            (cv2.COLORMAP_JET, "CV_JET"),
-            (cv2.COLORMAP_WINTER, "CV_WINTER"),
-            (cv2.COLORMAP_RAINBOW, "CV_RAINBOW"),
-            (cv2.COLORMAP_OCEAN, "CV_OCEAN"),
-            (cv2.COLORMAP_SUMMER, "CV_SUMMER"),
-            (cv2.COLORMAP_SPRING, "CV_SPRING"),
-            (cv2.COLORMAP_COOL, "CV_COOL"),
-            (cv2.COLORMAP_HSV, "CV_HSV"),
-            (cv2.COLORMAP_PINK, "CV_PINK"),
-            (cv2.COLORMAP_HOT, "CV_HOT"),
-            (cv2.COLORMAP_PARULA, "CV_PARULA"),
-            (cv2.COLORMAP_MAGMA, "CV_MAGMA"),
-            (cv2.COLORMAP_INFERNO, "CV_INFERNO"),
-            (cv2.COLORMAP_PLASMA, "CV_PLASMA"),
-            (cv2.COLORMAP_VIRIDIS, "CV_VIRIDIS"),
-            (cv2.COLORMAP_CIVIDIS, "CV_CIVIDIS"),
-            (cv2.COLORMAP_TWILIGHT, "CV_TWILIGHT"),
-            (cv2.COLORMAP_TURBO, "CV_TURBO")
-        ]
-        
-        # Colormaps de matplotlib
-        self.matplotlib_colormaps = [
-            'flag', 'prism', 'ocean', 'gist_earth', 'terrain',
-            'gist_stern', 'gnuplot', 'gnuplot2', 'CMRmap',
-            'cubehelix', 'brg', 'gist_rainbow', 'rainbow', 'jet',
-            'turbo', 'nipy_spectral', 'gist_ncar', 'tab10', 'tab20',
-            'Set1', 'Set2', 'Set3', 'Pastel1', 'Pastel2', 'Paired',
-            'Accent', 'Dark2', 'seismic', 'coolwarm', 'bwr',
-            'copper', 'gray', 'bone', 'pink', 'spring', 'summer',
-            'autumn', 'winter', 'cool', 'hot', 'afmhot', 'gist_heat'
-        ]
+        self.initialize_webcam(source)
+        
+        # Colormaps disponibles (listas a nivel de módulo, también las usa benchmark.py)
+        self.opencv_colormaps = list(OPENCV_COLORMAPS)
+        self.matplotlib_colormaps = list(MATPLOTLIB_COLORMAPS)
+        
+        # Registro de LUT precalculadas (se guardan en disco para el siguiente arranque)
+        self.colormap_registry = ColormapRegistry(cache_path='colormap_luts.npz')
         
         # Combinar colormaps
         self.all_colormaps = []
         
         # Añadir OpenCV
         for cv_map, name in self.opencv_colormaps:
+            self.colormap_registry.register('opencv', cv_map)
             self.all_colormaps.append(('opencv', cv_map, name))
         
-        # Añadir matplotlib (verificar disponibilidad)
+        # Añadir matplotlib (verificar disponibilidad y convertir a LUT una sola vez)
         for mpl_name in self.matplotlib_colormaps:
-            try:
-                plt.get_cmap(mpl_name)
+            if self.colormap_registry.register('matplotlib', mpl_name):
                 self.all_colormaps.append(('matplotlib', mpl_name, f"MPL_{mpl_name.upper()}"))
-            except:
-                continue
+        
+        self.colormap_registry.save()
+        
+        # Motor por lotes: un solo gris y una sola pasada para todas las celdas
+        self.batch_renderer = BatchColormapRenderer(self.colormap_registry, fill_value=25)
+        self.use_batch_render = True
+        self.render_ms = {'lotes': 0.0, 'celda': 0.0}
+        
+        # Caché de la parte estática de la retícula (fondo, cabecera, bordes y nombres)
+        self.chrome_canvas = None
+        self.chrome_key = None
+        self.chrome_hits = 0
+        self.chrome_misses = 0
         
         # Configuración de interfaz
         self.grid_cols = 8
@@ -81,10 +105,25 @@ class RobustColormapGridViewer:
         # Variables de control
         self.brightness = 0
         self.contrast = 100
+        self.color_adjuster = ColorAdjuster()  # Brillo/contraste (nada si son neutros)
+        self.frame_context = FrameContext()    # Gris de la miniatura, compartido por todas las celdas
+        
+        # Tiempos por etapa (HUD con la tecla H y traza opcional al salir)
+        self.perf = FrameTimer(['captura', 'ajuste', 'reticula', 'vista', 'imshow', 'waitkey'],
+                               keep_trace=bool(trace_path))
+        self.show_hud = False
+        self.trace_path = trace_path
+        
+        # Redibujar solo con frame nuevo o cambios de interfaz, como mucho a target_fps
+        self.pacer = FramePacer(target_fps=30)
+        self.last_grid = None
         self.selected_colormap = -1
         self.current_category = 'all'
         self.use_demo_image = False
         
+        # Capturas en segundo plano (la retícula se copia antes de encolarla)
+        self.capture_saver = CaptureSaver(fmt='jpg')
+        
         # Crear imagen de demostración
         self.demo_image = self.create_demo_image()
         
@@ -92,11 +131,9 @@ class RobustColormapGridViewer:
         print(f"   - OpenCV: {len(self.opencv_colormaps)}")
         print(f"   - Matplotlib: {len([x for x in self.all_colormaps if x[0] == 'matplotlib'])}")
         
-        # Iniciar hilo de captura de frames
+        # Iniciar hilo de captura de frames (anillo preasignado, sin copias)
         if self.cap and self.cap.isOpened():
-            self.capture_thread = threading.Thread(target=self.capture_frames)
-            self.capture_thread.daemon = True
-            self.capture_thread.start()
+            self.capture = LatestFrameCapture(self.cap, slots=3).start()
             print("📹 Webcam inicializada correctamente")
         else:
             print("⚠️  Usando imagen de demostración (webcam no disponible)")
@@ -104,43 +141,22 @@ class RobustColormapGridViewer:
         
         self.print_controls()
     
-    def initialize_webcam(self):
-        """Inicializa la webcam probando diferentes backends"""
-        backends = [
-            (cv2.CAP_DSHOW, "DirectShow"),
-            (cv2.CAP_MSMF, "Media Foundation"),
-            (cv2.CAP_V4L2, "Video4Linux"),
-            (cv2.CAP_ANY, "Default")
-        ]
-        
-        for backend, name in backends:
+    def initialize_webcam(self, source=None):
+        """Abre la fuente indicada o la webcam probando diferentes backends"""
+        if source is not None:
             try:
-                print(f"🔍 Probando backend {name}...")
-                cap = cv2.VideoCapture(0, backend)
-                
-                if cap.isOpened():
-                    # Configurar propiedades para estabilidad
-                    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-                    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-                    cap.set(cv2.CAP_PROP_FPS, 15)  # FPS más bajo para estabilidad
-                    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-                    
-                    # Probar captura
-                    ret, frame = cap.read()
-                    if ret and frame is not None:
-                        print(f"✅ Backend {name} funcionando")
-                        self.cap = cap
-                        return
-                    else:
-                        cap.release()
-                        
+                # Vídeos y fuentes sintéticas a su ritmo nominal: el hilo de captura no gira en vacío
+                self.cap = open_source(source, realtime=True)
+                print(f"📼 Fuente de vídeo: {self.cap.name}")
             except Exception as e:
-                print(f"❌ Backend {name} falló: {e}")
-                continue
+                print(f"❌ No se pudo abrir la fuente {source}: {e}")
+                self.cap = None
+            return
         
-        print("⚠️  No se pudo inicializar ninguna webcam")
-        self.cap = None
+        # FPS más bajo para estabilidad
+        self.cap = WebcamSource.probe(0, width=640, height=480, fps=15)
     
+
     def create_demo_image(self):
         """Crea una imagen de demostración con gradientes y patrones"""
         img = np.zeros((480, 640, 3), dtype=np.uint8)
@@ -160,76 +176,36 @@ class RobustColormapGridViewer:
         
         return img
     
-    def capture_frames(self):
-        """Captura frames en un hilo separado para evitar bloqueos"""
-        consecutive_failures = 0
-        max_failures = 10
-        
-        while self.running and self.cap and self.cap.isOpened():
-            try:
-                ret, frame = self.cap.read()
-                
-                if ret and frame is not None:
-                    with self.frame_lock:
-                        self.current_frame = frame.copy()
-                        self.frame_available = True
-                    consecutive_failures = 0
-                else:
-                    consecutive_failures += 1
-                    if consecutive_failures > max_failures:
-                        print("⚠️  Demasiados fallos de captura, cambiando a modo demo")
-                        self.use_demo_image = True
-                        break
-                
-                time.sleep(0.033)  # ~30 FPS
-                
-            except Exception as e:
-                consecutive_failures += 1
-                print(f"Error en captura: {e}")
-                if consecutive_failures > max_failures:
-                    self.use_demo_image = True
-                    break
-                time.sleep(0.1)
-    
     def get_current_frame(self):
-        """Obtiene el frame actual de forma segura"""
-        if self.use_demo_image:
-            return self.demo_image.copy()
-        
-        with self.frame_lock:
-            if self.frame_available and self.current_frame is not None:
-                return self.current_frame.copy()
-            else:
-                return self.demo_image.copy()
+        """Obtiene una vista del último frame capturado (sin copiar)"""
+        if self.use_demo_image or self.capture is None:
+            return self.demo_image
+        
+        if self.capture.failed:
+            self.use_demo_image = True
+            return self.demo_image
+        
+        sequence, frame = self.capture.latest()
+        if frame is None:
+            return self.demo_image
+        
+        self.frame_sequence = sequence
+        return frame
     
     def matplotlib_colormap_to_opencv(self, gray_image, colormap_name):
-        """Convierte colormap de matplotlib a formato OpenCV"""
-        try:
-            cmap = plt.get_cmap(colormap_name)
-            normalized = gray_image.astype(np.float32) / 255.0
-            colored = cmap(normalized)
-            colored_bgr = colored[:, :, [2, 1, 0]]
-            return (colored_bgr * 255).astype(np.uint8)
-        except Exception as e:
-            return cv2.cvtColor(gray_image, cv2.COLOR_GRAY2BGR)
+        """Aplica un colormap de matplotlib usando su LUT precalculada"""
+        return self.colormap_registry.apply(gray_image, ('matplotlib', colormap_name))
     
     def adjust_image(self, frame):
         """Ajusta brillo y contraste"""
-        alpha = self.contrast / 100.0
-        beta = self.brightness
-        return cv2.convertScaleAbs(frame, alpha=alpha, beta=beta)
+        return self.color_adjuster.brightness_contrast(frame, self.brightness, self.contrast)
     
-    def apply_colormap_to_frame(self, frame, colormap_info):
+    def apply_colormap_to_frame(self, frame, colormap_info, context=None):
         """Aplica colormap al frame"""
-        colormap_type, colormap_data, _ = colormap_info
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        gray = context.gray() if context is not None else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         
-        if colormap_type == 'opencv':
-            return cv2.applyColorMap(gray, colormap_data)
-        elif colormap_type == 'matplotlib':
-            return self.matplotlib_colormap_to_opencv(gray, colormap_data)
-        else:
-            return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+        # OpenCV y matplotlib cuestan lo mismo: una búsqueda en la LUT de 256 entradas
+        return self.colormap_registry.apply(gray, colormap_info)
     
     def get_filtered_colormaps(self):
         """Filtra colormaps según categoría"""
@@ -240,12 +216,13 @@ class RobustColormapGridViewer:
         else:
             return self.all_colormaps
     
-    def create_grid_display(self, original_frame):
-        """Crea la retícula de colormaps"""
-        current_colormaps = self.get_filtered_colormaps()
-        current_rows = math.ceil(len(current_colormaps) / self.grid_cols)
-        current_height = max(current_rows * self.cell_height + (current_rows + 1) * self.padding + 100, 500)
-        
+    def get_chrome_key(self):
+        """Estado del que depende la parte estática de la retícula"""
+        return (self.current_category, self.selected_colormap, self.brightness,
+                self.contrast, self.use_demo_image)
+    
+    def draw_grid_chrome(self, current_colormaps, current_height):
+        """Dibuja fondo, cabecera, bordes y nombres (solo cuando cambia el estado)"""
         grid_image = np.zeros((current_height, self.window_width, 3), dtype=np.uint8)
         grid_image.fill(25)
         
@@ -268,16 +245,10 @@ class RobustColormapGridViewer:
         info_text = f"Total: {len(current_colormaps)} | Brillo: {self.brightness:+d} | Contraste: {self.contrast}%"
         cv2.putText(grid_image, info_text, (20, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
         
-        controls_text = "1:OpenCV | 2:Matplotlib | 3:Todos | D:Demo | +/-:Brillo | C/V:Contraste | ESC:Salir"
+        controls_text = "1:OpenCV | 2:Matplotlib | 3:Todos | D:Demo | B:Lotes | +/-:Brillo | C/V:Contraste | ESC:Salir"
         cv2.putText(grid_image, controls_text, (20, 75), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (150, 150, 150), 1)
         
-        # Redimensionar frame
-        try:
-            resized_frame = cv2.resize(original_frame, (self.cell_width - 15, self.cell_height - 25))
-        except:
-            resized_frame = cv2.resize(self.demo_image, (self.cell_width - 15, self.cell_height - 25))
-        
-        # Crear celdas
+        # Bordes y nombres de cada celda
         for i, colormap_info in enumerate(current_colormaps):
             row = i // self.grid_cols
             col = i % self.grid_cols
@@ -288,38 +259,103 @@ class RobustColormapGridViewer:
             if y + self.cell_height > grid_image.shape[0]:
                 break
             
-            try:
-                colormap_frame = self.apply_colormap_to_frame(resized_frame, colormap_info)
-                
-                is_selected = (i == self.selected_colormap)
-                border_color = (0, 255, 255) if is_selected else (80, 80, 80)
-                border_thickness = 2 if is_selected else 1
-                
-                cv2.rectangle(grid_image, (x-1, y-1), 
-                             (x + self.cell_width + 1, y + self.cell_height + 1), 
-                             border_color, border_thickness)
-                
-                # Insertar imagen de forma segura
-                h, w = colormap_frame.shape[:2]
-                end_y = min(y + 5 + h, grid_image.shape[0])
-                end_x = min(x + 8 + w, grid_image.shape[1])
-                
-                grid_image[y+5:end_y, x+8:end_x] = colormap_frame[:end_y-y-5, :end_x-x-8]
+            is_selected = (i == self.selected_colormap)
+            border_color = (0, 255, 255) if is_selected else (80, 80, 80)
+            border_thickness = 2 if is_selected else 1
+            
+            cv2.rectangle(grid_image, (x-1, y-1), 
+                         (x + self.cell_width + 1, y + self.cell_height + 1), 
+                         border_color, border_thickness)
+            
+            # Nombre del colormap
+            _, _, name = colormap_info
+            display_name = name[:12] + "..." if len(name) > 15 else name
+            text_color = (100, 255, 100) if colormap_info[0] == 'opencv' else (255, 150, 100)
+            
+            cv2.putText(grid_image, display_name, (x + 8, y + self.cell_height - 6), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.3, text_color, 1)
+        
+        return grid_image
+    
+    def draw_dynamic_header(self, grid_image, render_mode):
+        """Redibuja solo la zona de la cabecera que cambia en cada frame"""
+        x = self.window_width - 260
+        cv2.rectangle(grid_image, (x, 36), (self.window_width - 1, 80), (25, 25, 25), -1)
+        cv2.putText(grid_image, f"Render ({render_mode}): {self.render_ms[render_mode]:.1f} ms", 
+                   (x, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (200, 200, 200), 1)
+        total = self.chrome_hits + self.chrome_misses
+        cv2.putText(grid_image, f"Chrome reutilizado: {self.chrome_hits}/{total}", 
+                   (x, 70), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (150, 150, 150), 1)
+    
+    def create_grid_display(self, original_frame):
+        """Crea la retícula de colormaps"""
+        current_colormaps = self.get_filtered_colormaps()
+        current_rows = math.ceil(len(current_colormaps) / self.grid_cols)
+        current_height = max(current_rows * self.cell_height + (current_rows + 1) * self.padding + 100, 500)
+        
+        # Reutilizar el lienzo con la parte estática si el estado no ha cambiado
+        chrome_key = self.get_chrome_key()
+        if self.chrome_canvas is not None and chrome_key == self.chrome_key:
+            grid_image = self.chrome_canvas
+            self.chrome_hits += 1
+        else:
+            grid_image = self.draw_grid_chrome(current_colormaps, current_height)
+            self.chrome_canvas = grid_image
+            self.chrome_key = chrome_key
+            self.chrome_misses += 1
+        
+        # Redimensionar frame
+        try:
+            resized_frame = cv2.resize(original_frame, (self.cell_width - 15, self.cell_height - 25))
+        except:
+            resized_frame = cv2.resize(self.demo_image, (self.cell_width - 15, self.cell_height - 25))
+        
+        self.frame_context.new_frame(resized_frame)
+        
+        # Sobrescribir únicamente las miniaturas
+        render_mode = 'lotes' if self.use_batch_render else 'celda'
+        render_start = time.perf_counter()
+        if self.use_batch_render:
+            thumb_h, thumb_w = resized_frame.shape[:2]
+            cells = grid_cell_views(grid_image, (85 + self.padding + 5, self.padding + 8),
+                                    (self.cell_height + self.padding, self.cell_width + self.padding),
+                                    (thumb_h, thumb_w), current_rows, self.grid_cols)
+            self.batch_renderer.render(self.frame_context.gray(), cells, current_colormaps)
+        else:
+            for i, colormap_info in enumerate(current_colormaps):
+                row = i // self.grid_cols
+                col = i % self.grid_cols
                 
-                # Nombre del colormap
-                _, _, name = colormap_info
-                display_name = name[:12] + "..." if len(name) > 15 else name
-                text_color = (100, 255, 100) if colormap_info[0] == 'opencv' else (255, 150, 100)
+                x = col * self.cell_width + (col + 1) * self.padding
+                y = row * self.cell_height + (row + 1) * self.padding + 85
                 
-                cv2.putText(grid_image, display_name, (x + 8, y + self.cell_height - 6), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.3, text_color, 1)
+                if y + self.cell_height > grid_image.shape[0]:
+                    break
                 
-            except Exception as e:
-                # Celda de error
-                cv2.rectangle(grid_image, (x, y), (x + self.cell_width, y + self.cell_height), 
-                             (50, 50, 50), -1)
-                cv2.putText(grid_image, "ERROR", (x + 40, y + 60), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 1)
+                try:
+                    colormap_frame = self.apply_colormap_to_frame(resized_frame, colormap_info, self.frame_context)
+                    
+                    # Insertar imagen de forma segura
+                    h, w = colormap_frame.shape[:2]
+                    end_y = min(y + 5 + h, grid_image.shape[0])
+                    end_x = min(x + 8 + w, grid_image.shape[1])
+                    
+                    grid_image[y+5:end_y, x+8:end_x] = colormap_frame[:end_y-y-5, :end_x-x-8]
+                    
+                except Exception as e:
+                    # Celda de error (invalida la caché para restaurar la celda después)
+                    cv2.rectangle(grid_image, (x, y), (x + self.cell_width, y + self.cell_height), 
+                                 (50, 50, 50), -1)
+                    cv2.putText(grid_image, "ERROR", (x + 40, y + 60), 
+                               cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 1)
+                    self.chrome_key = None
+        
+        # Media móvil del tiempo de render de miniaturas
+        elapsed_ms = (time.perf_counter() - render_start) * 1000
+        previous = self.render_ms[render_mode]
+        self.render_ms[render_mode] = elapsed_ms if previous == 0 else 0.9 * previous + 0.1 * elapsed_ms
+        
+        self.draw_dynamic_header(grid_image, render_mode)
         
         return grid_image
     
@@ -349,12 +385,66 @@ class RobustColormapGridViewer:
         print("D          - Activar/desactivar modo demo")
         print("+/-        - Ajustar brillo")
         print("C/V        - Ajustar contraste") 
+        print("B          - Render por lotes / por celda (comparar tiempos)")
         print("R          - Reset valores")
         print("ESPACIO    - Captura de pantalla")
+        print("X          - Ráfaga de 10 capturas")
+        print("H          - HUD de rendimiento (tiempos por etapa)")
+        print("[ / ]      - Bajar/subir FPS objetivo")
         print("Click      - Seleccionar colormap")
         print("ESC        - Salir")
         print("=" * 40)
     
+    def get_render_key(self):
+        """Todo lo que cambia la imagen: frame nuevo o estado de la interfaz"""
+        if self.use_demo_image or self.capture is None or self.capture.failed:
+            frame_key = 'demo'
+        else:
+            frame_key = self.capture.sequence
+        return (frame_key, self.get_chrome_key(), self.use_batch_render, self.show_hud)
+    
+    def render_frame(self):
+        """Dibuja la retícula y la vista seleccionada; devuelve la retícula"""
+        # Obtener frame actual
+        current_frame = self.get_current_frame()
+        self.perf.lap('captura')
+        adjusted_frame = self.adjust_image(current_frame)
+        self.perf.lap('ajuste')
+        
+        # Crear visualización
+        grid_display = self.create_grid_display(adjusted_frame)
+        self.perf.lap('reticula')
+        
+        # Vista seleccionada
+        current_colormaps = self.get_filtered_colormaps()
+        
+        if self.selected_colormap != -1 and self.selected_colormap < len(current_colormaps):
+            colormap_info = current_colormaps[self.selected_colormap]
+            large_frame = cv2.resize(adjusted_frame, (480, 360))
+            selected_display = self.apply_colormap_to_frame(large_frame, colormap_info)
+            
+            _, _, name = colormap_info
+            cv2.putText(selected_display, f"COLORMAP: {name}", 
+                       (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+            cv2.putText(selected_display, f"Tipo: {colormap_info[0].upper()}", 
+                       (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
+        else:
+            selected_display = cv2.resize(adjusted_frame, (480, 360))
+            cv2.putText(selected_display, "ORIGINAL - Click para seleccionar", 
+                       (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+        
+        if self.show_hud:
+            self.perf.draw_hud(selected_display, (15, 95))
+            cv2.putText(selected_display, f"Objetivo: {self.pacer.target_fps:.0f} FPS | "
+                       f"redibujados {self.pacer.rendered} / saltados {self.pacer.skipped}",
+                       (15, 345), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 255), 1)
+        self.perf.lap('vista')
+        
+        cv2.imshow('Robust Colormap Viewer', grid_display)
+        cv2.imshow('Selected View', selected_display)
+        self.perf.lap('imshow')
+        return grid_display
+    
     def run(self):
         """Ejecuta la aplicación principal"""
         cv2.namedWindow('Robust Colormap Viewer', cv2.WINDOW_NORMAL)
@@ -365,43 +455,24 @@ class RobustColormapGridViewer:
         
         print("🎨 Robust Colormap Viewer iniciado")
         
-        frame_count = 0
-        
         try:
             while True:
-                frame_count += 1
-                
-                # Obtener frame actual
-                current_frame = self.get_current_frame()
-                adjusted_frame = self.adjust_image(current_frame)
+                render_key = self.get_render_key()
+                rendered = self.pacer.should_render(render_key)
+                if rendered:
+                    self.pacer.begin(render_key)
+                    self.perf.start_frame()
+                    self.last_grid = self.render_frame()
                 
-                # Crear visualización
-                grid_display = self.create_grid_display(adjusted_frame)
-                cv2.imshow('Robust Colormap Viewer', grid_display)
+                # La ráfaga sigue aunque no haya redibujado (p. ej. imagen demo estática)
+                if self.last_grid is not None:
+                    self.capture_saver.update(self.last_grid)
                 
-                # Vista seleccionada
-                current_colormaps = self.get_filtered_colormaps()
-                
-                if self.selected_colormap != -1 and self.selected_colormap < len(current_colormaps):
-                    colormap_info = current_colormaps[self.selected_colormap]
-                    large_frame = cv2.resize(adjusted_frame, (480, 360))
-                    selected_display = self.apply_colormap_to_frame(large_frame, colormap_info)
-                    
-                    _, _, name = colormap_info
-                    cv2.putText(selected_display, f"COLORMAP: {name}", 
-                               (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-                    cv2.putText(selected_display, f"Tipo: {colormap_info[0].upper()}", 
-                               (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
-                    
-                    cv2.imshow('Selected View', selected_display)
-                else:
-                    original_large = cv2.resize(adjusted_frame, (480, 360))
-                    cv2.putText(original_large, "ORIGINAL - Click para seleccionar", 
-                               (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-                    cv2.imshow('Selected View', original_large)
-                
-                # Manejar teclas
-                key = cv2.waitKey(30) & 0xFF  # Tiempo de espera más largo
+                # Manejar teclas (esperando lo que queda del presupuesto del frame)
+                key = cv2.waitKey(self.pacer.wait_ms()) & 0xFF
+                if rendered:
+                    self.perf.lap('waitkey')
+                    self.perf.end_frame()
                 
                 if key == 27:  # ESC
                     break
@@ -433,15 +504,28 @@ class RobustColormapGridViewer:
                 elif key == ord('v'):
                     self.contrast = max(50, self.contrast - 10)
                     print(f"🔅 Contraste: {self.contrast}%")
+                elif key == ord('b') or key == ord('B'):
+                    self.use_batch_render = not self.use_batch_render
+                    mode = "POR LOTES" if self.use_batch_render else "POR CELDA"
+                    print(f"⚡ Render {mode} | lotes: {self.render_ms['lotes']:.2f} ms | celda: {self.render_ms['celda']:.2f} ms")
                 elif key == ord('r'):
                     self.brightness = 0
                     self.contrast = 100
                     self.selected_colormap = -1
                     print("🔄 Valores reseteados")
                 elif key == ord(' '):
-                    filename = f"colormap_capture_{int(time.time())}.jpg"
-                    cv2.imwrite(filename, grid_display)
-                    print(f"📸 Captura guardada: {filename}")
+                    filename = self.capture_saver.save(self.last_grid, prefix='colormap_capture')
+                    if filename:
+                        print(f"📸 Captura en cola: {filename}")
+                elif key == ord('x') or key == ord('X'):
+                    self.capture_saver.start_burst(10, 0.2, prefix='colormap_burst')
+                    print("📸 Ráfaga de 10 capturas")
+                elif key == ord('h') or key == ord('H'):
+                    self.show_hud = not self.show_hud
+                elif key == ord('[') or key == ord(']'):
+                    step = 5 if key == ord(']') else -5
+                    self.pacer.set_target_fps(min(120, max(5, self.pacer.target_fps + step)))
+                    print(f"🎯 FPS objetivo: {self.pacer.target_fps:.0f}")
         
         except KeyboardInterrupt:
             print("\n⚠️  Interrupción por teclado")
@@ -454,6 +538,26 @@ class RobustColormapGridViewer:
         """Limpia recursos"""
         self.running = False
         
+        saved, dropped = self.capture_saver.close()
+        if saved or dropped:
+            print(f"📸 Capturas guardadas: {saved} | descartadas: {dropped}")
+        
+        if self.capture:
+            self.capture.stop()
+            print(f"📹 Frames capturados: {self.capture.sequence} | descartados: {self.capture.dropped} "
+                  f"| FPS cámara: {self.capture.fps:.1f}")
+        
+        print(f"⏱️  Render medio de miniaturas: lotes {self.render_ms['lotes']:.2f} ms "
+              f"({self.batch_renderer.method}) | por celda {self.render_ms['celda']:.2f} ms")
+        print(f"🧩 Chrome de la retícula reutilizado en {self.chrome_hits} de "
+              f"{self.chrome_hits + self.chrome_misses} frames")
+        stats = self.frame_context.stats()
+        print(f"🧠 Conversiones a gris ahorradas: {stats['hits']} de {stats['hits'] + stats['misses']}")
+        print(self.perf.report())
+        print(f"🖼️  Redibujados: {self.pacer.rendered} | vueltas sin cambios: {self.pacer.skipped}")
+        if self.trace_path:
+            print(f"📄 Traza de tiempos: {self.perf.dump(self.trace_path)}")
+        
         if self.cap:
             self.cap.release()
         
@@ -464,7 +568,14 @@ class RobustColormapGridViewer:
 # Ejecutar aplicación
 if __name__ == "__main__":
     try:
-        app = RobustColormapGridViewer()
+        parser = argparse.ArgumentParser(description="Robust Colormap Viewer")
+        parser.add_argument('source', nargs='?', default=None, help="Webcam, vídeo, carpeta o synthetic")
+        parser.add_argument('--traza', default=None, help="Guardar los tiempos por frame al salir (.csv o .json)")
+        parser.add_argument('--fps-objetivo', type=float, default=30, help="Máximo de redibujados por segundo")
+        args = parser.parse_args()
+        
+        app = RobustColormapGridViewer(args.source, trace_path=args.traza)
+        app.pacer.set_target_fps(args.fps_objetivo)
         app.run()
     except Exception as e:
         print(f"❌ Error fatal: {e}")
@@ -0,0 +1,156 @@
+# Procesado por lotes de vídeos con los filtros de WebcamFilterApp (wcam_Canny3.py)
+# Sin ventanas ni trackbars: los frames se leen, se filtran y se escriben a máxima velocidad.
+#
+# Ejemplos:
+#   py wcam_batch.py grabacion.mp4 --filtro Cartoon
+#   py wcam_batch.py *.mp4 --filtro Canny --canny-min 50 --canny-max 150 --salida procesados
+#   py wcam_batch.py synthetic:1280x720:noise --frames 300 --filtro Thermal --colormap Jet
+
+import argparse
+import glob
+import itertools
+import os
+import time
+import cv2
+from frame_sources import open_source
+from filter_pool import MultiprocessFilterPipeline
+from wcam_Canny3 import WebcamFilterApp
+from filters import FilterChain
+
+
+def output_path_for(input_spec, output_dir, filter_name, extension):
+    """Nombre de salida: <carpeta>/<nombre>_<filtro>.<ext>"""
+    stem = os.path.splitext(os.path.basename(os.path.normpath(str(input_spec))))[0]
+    stem = stem.replace(':', '_') or 'video'
+    filter_name = filter_name.lower().replace(FilterChain.SEPARATOR, '-')
+    return os.path.join(output_dir, f"{stem}_{filter_name}.{extension}")
+
+
+def read_frames(source, max_frames=None):
+    """Generador de frames reutilizando siempre el mismo buffer de lectura"""
+    frame_buffer = None
+    count = 0
+    while max_frames is None or count < max_frames:
+        ret, frame = source.read(image=frame_buffer)
+        if not ret:
+            break
+        frame_buffer = frame
+        count += 1
+        yield frame
+
+
+def process_video(app, input_spec, output_path, codec='XVID', max_frames=None, workers=0):
+    """Pasa todos los frames de una fuente por la cadena de filtros y los graba
+
+    Con workers > 0 el filtrado se reparte entre procesos (filter_pool.py).
+    Devuelve (frames procesados, segundos de reloj).
+    """
+    source = open_source(input_spec, loop=False)  # Una sola pasada también por las carpetas
+    if not source.isOpened():
+        raise IOError(f"No se pudo abrir {input_spec}")
+
+    fps = source.get(cv2.CAP_PROP_FPS) or 30.0
+    writer = None
+    pipeline = None
+    frames = 0
+    start = time.perf_counter()
+
+    try:
+        # El primer frame fija el tamaño de la memoria compartida
+        frame_iter = read_frames(source, max_frames)
+        first = next(frame_iter, None)
+        frame_iter = itertools.chain([first] if first is not None else [], frame_iter)
+
+        if workers > 0 and first is not None:
+            pipeline = MultiprocessFilterPipeline(first.shape, workers=workers).start()
+            results = (frame for _, frame in pipeline.map(frame_iter, app.filter_params()))
+        else:
+            results = (app.process_frame(frame) for frame in frame_iter)
+
+        for processed in results:
+            # El VideoWriter se crea con el tamaño real del primer frame procesado
+            if writer is None:
+                h, w = processed.shape[:2]
+                writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*codec), fps, (w, h))
+                if not writer.isOpened():
+                    raise IOError(f"No se pudo crear {output_path} con el codec {codec}")
+
+            writer.write(processed)
+            frames += 1
+    finally:
+        if pipeline is not None:
+            pipeline.close()
+        source.release()
+        if writer is not None:
+            writer.release()
+
+    return frames, time.perf_counter() - start
+
+
+def expand_inputs(inputs):
+    """Expande comodines (útil en Windows, donde la terminal no lo hace)"""
+    expanded = []
+    for spec in inputs:
+        matches = sorted(glob.glob(spec)) if any(c in spec for c in '*?[') else []
+        expanded.extend(matches or [spec])
+    return expanded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aplica los filtros de WebcamFilterApp a vídeos sin interfaz gráfica")
+    parser.add_argument('inputs', nargs='+', help="Vídeos, carpetas de imágenes o synthetic[:ANCHOxALTO[:patrón]]")
+    parser.add_argument('--filtro', default='Original', help="Nombre o número del filtro (p. ej. Cartoon o 5)")
+    parser.add_argument('--cadena', default=None, help='Cadena de filtros en lugar de --filtro, p. ej. "Sharpen>Cartoon>Thermal"')
+    parser.add_argument('--salida', default='.', help="Carpeta de salida")
+    parser.add_argument('--codec', default='XVID', help="FourCC del VideoWriter")
+    parser.add_argument('--extension', default='avi', help="Extensión de los vídeos de salida")
+    parser.add_argument('--frames', type=int, default=None, help="Máximo de frames por entrada")
+    parser.add_argument('--workers', type=int, default=0, help="Procesos para filtrar en paralelo (0 = sin procesos)")
+    parser.add_argument('--brillo', type=int, default=0, help="-50 a 50")
+    parser.add_argument('--contraste', type=int, default=100, help="0 a 200 (%%)")
+    parser.add_argument('--saturacion', type=int, default=100, help="0 a 200 (%%)")
+    parser.add_argument('--blur', type=int, default=1, help="Tamaño del kernel de blur")
+    parser.add_argument('--canny-min', type=int, default=100)
+    parser.add_argument('--canny-max', type=int, default=200)
+    parser.add_argument('--colormap', default='Jet', help="Nombre o número del colormap")
+    args = parser.parse_args(argv)
+
+    app = WebcamFilterApp(headless=True)
+    try:
+        app.configure(filter_name=args.filtro, brightness=args.brillo, contrast=args.contraste,
+                      saturation=args.saturacion, blur=args.blur, canny_min=args.canny_min,
+                      canny_max=args.canny_max, colormap=args.colormap, chain=args.cadena)
+    except (ValueError, IndexError) as e:
+        parser.error(str(e))
+    filter_name = app.active_filter_name()
+
+    os.makedirs(args.salida, exist_ok=True)
+
+    print(f"🎬 Procesado por lotes - filtro: {filter_name}")
+    print("=" * 40)
+
+    total_frames = 0
+    total_time = 0.0
+    try:
+        for input_spec in expand_inputs(args.inputs):
+            output_path = output_path_for(input_spec, args.salida, filter_name, args.extension)
+            try:
+                frames, elapsed = process_video(app, input_spec, output_path, args.codec, args.frames, args.workers)
+            except Exception as e:
+                print(f"❌ {input_spec}: {e}")
+                continue
+
+            fps = frames / elapsed if elapsed > 0 else 0.0
+            print(f"✅ {input_spec} -> {output_path}: {frames} frames en {elapsed:.2f} s ({fps:.1f} fps)")
+            total_frames += frames
+            total_time += elapsed
+    finally:
+        app.striped.close()
+
+    total_fps = total_frames / total_time if total_time > 0 else 0.0
+    print("=" * 40)
+    print(f"⏱️  Total: {total_frames} frames en {total_time:.2f} s ({total_fps:.1f} fps)")
+
+
+if __name__ == "__main__":
+    main()
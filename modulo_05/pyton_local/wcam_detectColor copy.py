@@ -1,8 +1,11 @@
+import sys
 import cv2
 import numpy as np
+from frame_sources import source_from_argv
+from color_segmentation import ColorSegmenter
 
-# Inicializa la webcam
-cap = cv2.VideoCapture(0)
+# Inicializa la fuente de vídeo: webcam 0 por defecto, o vídeo/carpeta/synthetic como argumento
+cap = source_from_argv(sys.argv)
 
 # Limites de valores HSV para detectar el color rojo
 redBajo1=np.array([0,50,50],np.uint8)
@@ -11,14 +14,14 @@ redAlto1=np.array([20,255,255],np.uint8)
 redBajo2=np.array([150,50,50],np.uint8)
 redAlto2=np.array([179,255,255],np.uint8)
 
+# Los dos rangos en un solo segmentador: la unión se hace con bitwise_or (la suma desbordaba uint8)
+segmenter=ColorSegmenter([(redBajo1,redAlto1),(redBajo2,redAlto2)])
+
 while True:
     ret,frame=cap.read()
-    if ret==True:
-        framesHSV=cv2.cvtColor(frame,cv2.COLOR_BGR2HSV) # Convertir a espacio de color HSV
-        maskRed1=cv2.inRange(framesHSV,redBajo1,redAlto1) # Crear una mascara con los valores
-        maskRed2=cv2.inRange(framesHSV,redBajo2,redAlto2) # Crear otra mascara con los valores
-        maskRed=maskRed1+maskRed2 # Sumar las dos mascaras
-
+    if not ret:
+        break
+    maskRed=segmenter.segment(frame) # Mascara con los píxeles de cualquiera de los dos rangos
 
     maskRedInv = cv2.bitwise_not(maskRed) # Invertir la máscara
     maskRedvis = cv2.bitwise_and(frame,frame,mask=maskRed) # Aplicar la mascara a la imagen original
@@ -1,12 +1,24 @@
+import argparse
 import cv2
 import numpy as np
+from frame_sources import open_source
+from color_segmentation import ColorSegmenter
+from blob_tracker import BlobTracker, RecordWriter
+from hsv_presets import PresetStore
 
 # Función vacía para los trackbars
 def nothing(x):
     pass
 
-# Inicializar la webcam
-cap = cv2.VideoCapture(0)
+parser = argparse.ArgumentParser(description="Detector de color HSV con seguimiento de objetos")
+parser.add_argument('source', nargs='?', default=0, help="Webcam, vídeo, carpeta o synthetic")
+parser.add_argument('--area-minima', type=int, default=150, help="Área mínima en píxeles de un objeto")
+parser.add_argument('--registro', default=None, help="Guardar los objetos de cada frame en JSON Lines")
+parser.add_argument('--presets', default='presets_color.json', help="Fichero JSON de presets HSV")
+args = parser.parse_args()
+
+# Inicializar la fuente de vídeo: webcam 0 por defecto, o vídeo/carpeta/synthetic como argumento
+cap = open_source(args.source)
 
 # Crear ventana para la imagen y controles
 cv2.namedWindow('image')
@@ -28,16 +40,50 @@ cv2.setTrackbarPos('VMax', 'image', 255)
 # Trackbar adicional para modo de visualización
 cv2.createTrackbar('Vista', 'image', 0, 3, nothing)
 
+# Segmentador: los rangos solo se recompilan cuando cambia algún trackbar
+segmenter = ColorSegmenter()
+kernel = np.ones((3,3), np.uint8)
+morph_open = morph_close = True
+
+# Presets guardados: rango HSV, vista y morfología
+presets = PresetStore(args.presets)
+
+def apply_preset(preset):
+    """Lleva un preset a los trackbars y devuelve su segmentador ya compilado"""
+    global kernel, morph_open, morph_close
+    for name, value in zip(('HMin', 'SMin', 'VMin'), preset['lower']):
+        cv2.setTrackbarPos(name, 'image', value)
+    for name, value in zip(('HMax', 'SMax', 'VMax'), preset['upper']):
+        cv2.setTrackbarPos(name, 'image', value)
+    cv2.setTrackbarPos('Vista', 'image', preset['vista'])
+    kernel = PresetStore.kernel(preset)
+    morph_open, morph_close = preset['open'], preset['close']
+    print(f"📂 Preset '{presets.active}': H({preset['lower'][0]}-{preset['upper'][0]}), "
+          f"S({preset['lower'][1]}-{preset['upper'][1]}), V({preset['lower'][2]}-{preset['upper'][2]})")
+    return presets.segmenter()
+
+if presets.get() is not None:
+    segmenter = apply_preset(presets.get())
+
+# Seguimiento de objetos sobre la máscara limpia
+tracker = BlobTracker(min_area=args.area_minima)
+writer = RecordWriter(args.registro) if args.registro else None
+tracking = True
+
 # Inicializar valores HSV min/max
 hMin = sMin = vMin = hMax = sMax = vMax = 0
 phMin = psMin = pvMin = phMax = psMax = pvMax = 0
 
 print("Controles:")
 print("- Ajusta los valores HSV con las barras deslizantes")
+print("- Si HMin > HMax el rango da la vuelta al tono (p. ej. rojo: 150-20)")
 print("- Vista: 0=Máscara, 1=Original, 2=Color detectado, 3=Fondo sin color")
 print("- Presiona 'q' para salir")
 print("- Presiona 'p' para imprimir valores actuales")
 print("- Presiona 'r' para resetear valores")
+print("- Presiona 's' para guardar los valores en el preset activo, 'n' para crear uno nuevo")
+print("- Presiona TAB para pasar al siguiente preset")
+print("- Presiona 't' para activar/desactivar el seguimiento de objetos")
 
 waitTime = 33
 
@@ -55,20 +101,17 @@ while True:
     vMax = cv2.getTrackbarPos('VMax', 'image')
     vista = cv2.getTrackbarPos('Vista', 'image')
     
-    # Configurar límites min y max HSV
-    lower = np.array([hMin, sMin, vMin])
-    upper = np.array([hMax, sMax, vMax])
-    
-    # Convertir a HSV
-    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    # Configurar límites min y max HSV (no hace nada si no han cambiado)
+    segmenter.set_ranges([((hMin, sMin, vMin), (hMax, sMax, vMax))])
     
     # Crear máscara HSV
-    mask = cv2.inRange(hsv, lower, upper)
+    mask = segmenter.segment(frame)
     
     # Aplicar operaciones morfológicas para limpiar la máscara
-    kernel = np.ones((3,3), np.uint8)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
+    if morph_open:
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
+    if morph_close:
+        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
     
     # Aplicar máscara a la imagen original
     result = cv2.bitwise_and(frame, frame, mask=mask)
@@ -87,6 +130,14 @@ while True:
     else:  # Fondo sin color
         output = background
     
+    # Seguimiento: IDs estables, velocidad y registros por frame
+    if tracking:
+        records = tracker.update(mask)
+        tracker.draw(output, records)
+        if writer:
+            writer.write(records)
+        cv2.putText(output, f'Objetos: {len(records)}', (10, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 1)
+    
     # Mostrar información de valores en la imagen
     cv2.putText(output, f'H: {hMin}-{hMax}', (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
     cv2.putText(output, f'S: {sMin}-{sMax}', (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
@@ -121,7 +172,29 @@ while True:
         cv2.setTrackbarPos('SMax', 'image', 255)
         cv2.setTrackbarPos('VMax', 'image', 255)
         print("Valores reseteados a rango completo")
+    elif key in (ord('s'), ord('n')):  # Guardar preset
+        name = presets.active if key == ord('s') and presets.active else presets.new_name()
+        presets.put(name, (hMin, sMin, vMin), (hMax, sMax, vMax), vista,
+                    kernel.shape[0], morph_open, morph_close)
+        presets.remember(segmenter)
+        presets.save()
+        print(f"💾 Preset '{name}' guardado en {args.presets}")
+    elif key == 9:  # TAB: siguiente preset
+        if presets.names():
+            segmenter = apply_preset(presets.next())
+        else:
+            print("No hay presets guardados (pulsa 'n' para crear uno)")
+    elif key == ord('t'):  # Seguimiento de objetos
+        tracking = not tracking
+        print(f"Seguimiento {'activado' if tracking else 'desactivado'}")
 
 # Cleanup
+print(f"🎨 Segmentación: método {segmenter.method}, {segmenter.rebuilds} recompilaciones de rangos")
+print(f"🎯 Seguimiento: {tracker.next_id - 1} objetos, {tracker.full_scans} búsquedas completas, "
+      f"{tracker.roi_scans} solo en ROI")
+presets.save()
+if writer:
+    writer.close()
+    print(f"💾 {writer.count} registros guardados en {args.registro}")
 cap.release()
 cv2.destroyAllWindows()
\ No newline at end of file
@@ -0,0 +1,73 @@
+import sys
+import cv2
+from frame_sources import source_from_argv
+from color_segmentation import ColorClassifier
+
+# Clases de color: (nombre, rangos HSV [(lower, upper)], color BGR para dibujar)
+# Un rango con H mínimo > H máximo da la vuelta al tono (rojo: 170-8)
+COLOR_CLASSES = [
+    ('Rojo', [((170, 100, 70), (8, 255, 255))], (0, 0, 255)),
+    ('Naranja', [((9, 100, 70), (20, 255, 255))], (0, 128, 255)),
+    ('Amarillo', [((21, 100, 70), (34, 255, 255))], (0, 255, 255)),
+    ('Verde', [((35, 80, 50), (85, 255, 255))], (0, 200, 0)),
+    ('Azul', [((86, 80, 50), (128, 255, 255))], (255, 100, 0)),
+    ('Morado', [((129, 80, 50), (169, 255, 255))], (200, 0, 200)),
+]
+
+# Inicializar la fuente de vídeo: webcam 0 por defecto, o vídeo/carpeta/synthetic como argumento
+cap = source_from_argv(sys.argv)
+
+classifier = ColorClassifier(COLOR_CLASSES)
+
+print("Controles:")
+print("- Presiona 'v' para cambiar entre etiquetas y original")
+print("- Presiona 1-9 para ver solo la máscara de una clase, 0 para todas")
+print("- Presiona 'p' para imprimir el recuento de píxeles por clase")
+print("- Presiona 'q' para salir")
+
+show_labels = True
+selected = None
+waitTime = 1
+
+while True:
+    ret, frame = cap.read()
+    if not ret:
+        break
+
+    # Una sola pasada para todas las clases
+    labels = classifier.classify(frame)
+    counts = classifier.counts()
+
+    if selected is not None:
+        output = cv2.bitwise_and(frame, frame, mask=classifier.mask(selected))
+    elif show_labels:
+        output = classifier.colorize(labels)
+    else:
+        output = frame.copy()
+
+    # Recuento por clase con su color
+    total = labels.size
+    for i, name in enumerate(classifier.names):
+        text = f"{i + 1} {name}: {counts[name] * 100.0 / total:5.1f}%"
+        cv2.putText(output, text, (10, 25 + 22 * i), cv2.FONT_HERSHEY_SIMPLEX, 0.6, classifier.colors[i], 2)
+
+    cv2.imshow('Colores', output)
+
+    key = cv2.waitKey(waitTime) & 0xFF
+    if key == ord('q'):
+        break
+    elif key == ord('v'):
+        show_labels = not show_labels
+        selected = None
+    elif key == ord('0'):
+        selected = None
+    elif ord('1') <= key <= ord('9') and key - ord('1') < len(classifier.names):
+        selected = key - ord('1')
+        print(f"🎯 Máscara de {classifier.names[selected]}")
+    elif key == ord('p'):
+        print("\n--- Píxeles por clase ---")
+        for name, pixels in counts.items():
+            print(f"{name:<10} {pixels:8d} ({pixels * 100.0 / total:5.1f}%)")
+
+cap.release()
+cv2.destroyAllWindows()
@@ -10,18 +10,20 @@
 
 # --------------------------------------------------------------------------------
 
+import sys
 import cv2
-import numpy as np
+from frame_sources import source_from_argv
 
-# Inicializa la webcam
-cap = cv2.VideoCapture(0)
+# Inicializa la fuente de vídeo: webcam 0 por defecto, o vídeo/carpeta/synthetic como argumento
+cap = source_from_argv(sys.argv)
 
 while True:
     ret,frame=cap.read()
-    if ret==True:
-        cv2.imshow('frame',frame)
-        if cv2.waitKey(1) & 0xFF==ord('q'):
-            break
+    if not ret:
+        break
+    cv2.imshow('frame',frame)
+    if cv2.waitKey(1) & 0xFF==ord('q'):
+        break
 
 cap.release()
 cv2.destroyAllWindows()